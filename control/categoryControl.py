@@ -1,4 +1,14 @@
-from util.dataLoader import load_categories, save_categories
+from util.categoryIndex import CategoryIndex, ENTITY_KINDS, issue_id, name_key
+from util.dataLoader import post_ids_by
+
+# 一括更新 API で指定する種類 → categories.json のキー
+BATCH_KINDS = {"category": "categories", "topic": "topics", "group": "groups"}
+
+# 種類ごとの、投稿側で参照しているキー（削除時の使用中チェック用）
+USAGE_KEYS = {"categories": "category_id", "topics": "topic_id", "groups": "group_id"}
+
+# 種類ごとの親の種類と、親IDを保持するキー
+PARENT_KEYS = {"topics": ("categories", "category_id"), "groups": ("topics", "topic_id")}
 
 
 class CategoryControl:
@@ -6,122 +16,352 @@ class CategoryControl:
     カテゴリ／トピック／グループの取得・新規作成を担当する制御クラス
 
     既存IDの利用と新規作成の分岐を共通化し、
-    投稿作成時のカテゴリ関連処理を簡潔にする目的で使用される
+    投稿作成・更新時のカテゴリ関連処理を簡潔にする目的で使用される。
+    カテゴリ管理画面からの一括更新（apply_batch）も担当する
+
+    ※ 各メソッドは読み込み済みのカテゴリデータ（cats）を書き換えるのみで保存は行わない。
+      保存は呼び出し側でまとめて1回だけ行う
     """
 
-    def add_or_get_category(self, mode, category_id, new_name):
+    def resolve_all(
+        self, cats,
+        category_mode, category_id, new_category_name,
+        topic_mode, topic_id, new_topic_name,
+        group_mode, group_id, new_group_name
+    ):
+        """
+        カテゴリ／トピック／グループのIDをまとめて取得または新規作成する
+
+        新規作成分は cats に追加される（保存は行わない）
+
+        :param cats: load_categories(for_update=True) で読み込んだカテゴリデータ
+                     （すべて既存IDを使用する場合は None でも良い）
+        :return: (category_id, topic_id, group_id)
+        :raises ValueError: 名前が空、または重複している場合
+        """
+        # すべて既存IDを使用する場合はカテゴリデータを参照せずにそのまま返す
+        if category_mode == topic_mode == group_mode == "existing":
+            return category_id, topic_id, group_id
+
+        # 重複チェック・ID採番用のインデックスを構築
+        idx = CategoryIndex(cats)
+
+        # カテゴリ取得または新規作成
+        category_id = self.add_or_get_category(
+            cats, idx, category_mode, category_id, new_category_name
+        )
+
+        # トピック取得または新規作成
+        topic_id = self.add_or_get_topic(
+            cats, idx, topic_mode, topic_id, new_topic_name, category_id
+        )
+
+        # グループ取得または新規作成
+        group_id = self.add_or_get_group(
+            cats, idx, group_mode, group_id, new_group_name, topic_id
+        )
+
+        return category_id, topic_id, group_id
+
+
+    def add_or_get_category(self, cats, idx, mode, category_id, new_name):
         """
         カテゴリIDを取得または新規作成する
 
+        :param cats: カテゴリデータ（新規作成時に追加される）
+        :param idx: cats から構築した CategoryIndex
         :param mode: "existing" または "new"
         :param category_id: 既存カテゴリID
         :param new_name: 新規カテゴリ名
         :return: カテゴリID
         """
-        # カテゴリ関連データを読み込む
-        cats = load_categories()
-
         # 既存カテゴリを使用する場合はそのままIDを返す
         if mode == "existing":
             return category_id
 
         # 新規カテゴリ作成処理
-        new_name_lower = new_name.lower()
+        if not new_name:
+            raise ValueError("カテゴリ名が空です。")
 
         # カテゴリ名の重複チェック（大文字小文字を区別しない）
-        if any(c["name"].lower() == new_name_lower for c in cats["categories"]):
-            raise ValueError("カテゴリ名が重複しています")
+        if idx.categories.has_name(new_name):
+            raise ValueError("既に同名カテゴリがあります。")
 
         # 新しいカテゴリIDを採番
-        new_id = max([c["id"] for c in cats["categories"]], default=0) + 1
+        new_id = issue_id(cats, "categories")
 
         # カテゴリを追加
-        cats["categories"].append({
+        new_category = {
             "id": new_id,
-            "name": new_name
-        })
-
-        # 更新内容を保存
-        save_categories(cats)
+            "name": new_name,
+            "name_lower": name_key(new_name)
+        }
+        cats["categories"].append(new_category)
+        idx.categories.add(new_category)
 
         return new_id
 
 
-    def add_or_get_topic(self, mode, topic_id, new_name, category_id):
+    def add_or_get_topic(self, cats, idx, mode, topic_id, new_name, category_id):
         """
         トピックIDを取得または新規作成する
 
+        :param cats: カテゴリデータ（新規作成時に追加される）
+        :param idx: cats から構築した CategoryIndex
         :param mode: "existing" または "new"
         :param topic_id: 既存トピックID
         :param new_name: 新規トピック名
         :param category_id: 紐づけるカテゴリID
         :return: トピックID
         """
-        # カテゴリ関連データを読み込む
-        cats = load_categories()
-
         # 既存トピックを使用する場合はそのままIDを返す
         if mode == "existing":
             return topic_id
 
         # 新規トピック作成処理
-        new_name_lower = new_name.lower()
+        if not new_name:
+            raise ValueError("トピック名が空です。")
 
         # トピック名の重複チェック
-        if any(t["name"].lower() == new_name_lower for t in cats["topics"]):
-            raise ValueError("トピック名が重複しています")
+        if idx.topics.has_name(new_name):
+            raise ValueError("既に同名トピックがあります。")
 
         # 新しいトピックIDを採番
-        new_id = max([t["id"] for t in cats["topics"]], default=0) + 1
+        new_id = issue_id(cats, "topics")
 
         # トピックを追加
-        cats["topics"].append({
+        new_topic = {
             "id": new_id,
             "name": new_name,
+            "name_lower": name_key(new_name),
             "category_id": category_id
-        })
-
-        # 更新内容を保存
-        save_categories(cats)
+        }
+        cats["topics"].append(new_topic)
+        idx.topics.add(new_topic)
 
         return new_id
 
 
-    def add_or_get_group(self, mode, group_id, new_name, topic_id):
+    def add_or_get_group(self, cats, idx, mode, group_id, new_name, topic_id):
         """
         グループIDを取得または新規作成する
 
+        :param cats: カテゴリデータ（新規作成時に追加される）
+        :param idx: cats から構築した CategoryIndex
         :param mode: "existing" または "new"
         :param group_id: 既存グループID
         :param new_name: 新規グループ名
         :param topic_id: 紐づけるトピックID
         :return: グループID
         """
-        # カテゴリ関連データを読み込む
-        cats = load_categories()
-
         # 既存グループを使用する場合はそのままIDを返す
         if mode == "existing":
             return group_id
 
         # 新規グループ作成処理
-        new_name_lower = new_name.lower()
+        if not new_name:
+            raise ValueError("グループ名が空です。")
 
         # グループ名の重複チェック
-        if any(g["name"].lower() == new_name_lower for g in cats["groups"]):
-            raise ValueError("グループ名が重複しています")
+        if idx.groups.has_name(new_name):
+            raise ValueError("既に同名グループがあります。")
 
         # 新しいグループIDを採番
-        new_id = max([g["id"] for g in cats["groups"]], default=0) + 1
+        new_id = issue_id(cats, "groups")
 
         # グループを追加
-        cats["groups"].append({
+        new_group = {
             "id": new_id,
             "name": new_name,
+            "name_lower": name_key(new_name),
             "topic_id": topic_id
-        })
-
-        # 更新内容を保存
-        save_categories(cats)
+        }
+        cats["groups"].append(new_group)
+        idx.groups.add(new_group)
 
         return new_id
+
+
+    # --------------------------------
+    # 一括更新
+    # --------------------------------
+    def apply_batch(self, cats, posts, ops):
+        """
+        カテゴリ／トピック／グループの作成・名前変更・削除をまとめて適用する
+
+        すべての操作を cats 上で順に適用する（保存は行わない）。
+        途中の操作でエラーになった場合は ValueError を送出するため、
+        呼び出し側で保存せずに破棄すれば、どの変更も反映されない
+
+        操作の形式:
+        - {"kind": "category", "action": "create", "name": ...}
+        - {"kind": "topic", "action": "create", "name": ..., "category_id": ...}
+        - {"kind": "group", "action": "create", "name": ..., "topic_id": ...}
+        - {"kind": "category" / "topic" / "group", "action": "update", "id": ..., "name": ...}
+        - {"kind": "category" / "topic" / "group", "action": "delete", "id": ...}
+
+        :param cats: load_categories(for_update=True) で読み込んだカテゴリデータ
+        :param posts: load_posts() で取得した投稿データ（削除時の使用中チェック用）
+        :param ops: 操作のリスト
+        :return: 操作ごとの対象ID（作成の場合は新しいID）のリスト
+        :raises ValueError: 操作の内容が不正、名前が重複している、
+                            または使用中のものを削除しようとした場合
+        """
+        # ID による検索・重複チェック用のインデックス（一括処理の間だけ使用する）
+        idx = CategoryIndex(cats)
+
+        # 削除対象のID（一覧の作り直しは最後に1回だけ行う）
+        deleted = {kind: set() for kind in ENTITY_KINDS}
+
+        results = []
+        for n, op in enumerate(ops, start=1):
+            kind = BATCH_KINDS.get(_op_str(op, "kind"))
+            if kind is None:
+                raise ValueError(f"{n}件目: 種類の指定が不正です。")
+
+            action = _op_str(op, "action")
+            entities = getattr(idx, kind)
+
+            if action == "create":
+                results.append(self._batch_create(cats, idx, deleted, kind, op, n))
+
+            elif action == "update":
+                entity_id = _op_id(op, "id", n)
+                entity = entities.by_id.get(entity_id)
+                if entity is None or entity_id in deleted[kind]:
+                    raise ValueError(f"{n}件目: 対象が見つかりません。")
+
+                name = _op_name(op, n)
+                if entities.has_name(name, exclude_id=entity_id):
+                    raise ValueError(f"{n}件目: 既に同名のものがあります。")
+
+                # cats はコピーのため、インデックス経由で直接書き換える
+                entities.rename(entity, name)
+                results.append(entity_id)
+
+            elif action == "delete":
+                entity_id = _op_id(op, "id", n)
+                entity = entities.by_id.get(entity_id)
+                if entity is None or entity_id in deleted[kind]:
+                    raise ValueError(f"{n}件目: 対象が見つかりません。")
+
+                # 投稿で使用されているものは削除不可
+                if post_ids_by(posts, USAGE_KEYS[kind], entity_id):
+                    raise ValueError(f"{n}件目: 使用している記事があるため削除できません。")
+
+                # 配下のトピック・グループも含めて削除予定にする
+                # （以降の操作で配下を指定した場合も「見つからない」エラーにする）
+                self._batch_delete(cats, idx, deleted, kind, entity)
+                results.append(entity_id)
+
+            else:
+                raise ValueError(f"{n}件目: 操作の指定が不正です。")
+
+        # 削除をまとめて反映する（配下のトピック・グループは削除時に追加済み）
+        for kind in ENTITY_KINDS:
+            if deleted[kind]:
+                cats[kind] = [e for e in cats[kind] if e["id"] not in deleted[kind]]
+
+        return results
+
+
+    def _batch_delete(self, cats, idx, deleted, kind, entity):
+        """
+        一括更新の削除操作を1件適用する（削除予定に追加する）
+
+        カテゴリの場合は配下のトピックとそのグループ、
+        トピックの場合は配下のグループも削除予定に追加する。
+        削除予定のものは名前のインデックスから取り除き、同じ名前で作成し直せるようにする
+
+        :param deleted: 種類ごとの削除予定のID（追加される）
+        :param entity: 削除するエンティティ
+        """
+        targets = [(kind, entity)]
+
+        if kind == "categories":
+            topics = [t for t in cats["topics"]
+                      if t["category_id"] == entity["id"] and t["id"] not in deleted["topics"]]
+            targets += [("topics", t) for t in topics]
+            topic_ids = {t["id"] for t in topics}
+        elif kind == "topics":
+            topic_ids = {entity["id"]}
+        else:
+            topic_ids = set()
+
+        if topic_ids:
+            targets += [("groups", g) for g in cats["groups"]
+                        if g["topic_id"] in topic_ids and g["id"] not in deleted["groups"]]
+
+        for target_kind, target in targets:
+            getattr(idx, target_kind).discard_name(target)
+            deleted[target_kind].add(target["id"])
+
+
+    def _batch_create(self, cats, idx, deleted, kind, op, n):
+        """
+        一括更新の作成操作を1件適用する
+
+        :param deleted: 種類ごとの削除予定のID（紐づけ先の確認に使用する）
+        :return: 新しいID
+        """
+        name = _op_name(op, n)
+
+        entities = getattr(idx, kind)
+        if entities.has_name(name):
+            raise ValueError(f"{n}件目: 既に同名のものがあります。")
+
+        entity = {"name": name, "name_lower": name_key(name)}
+
+        # 親（トピックはカテゴリ、グループはトピック）が存在するか確認
+        # （同じ一括更新で削除するものには紐づけられない）
+        parent = PARENT_KEYS.get(kind)
+        if parent is not None:
+            parent_kind, parent_key = parent
+            parent_id = _op_id(op, parent_key, n)
+            if parent_id not in getattr(idx, parent_kind).by_id or parent_id in deleted[parent_kind]:
+                raise ValueError(f"{n}件目: 紐づけ先が見つかりません。")
+            entity[parent_key] = parent_id
+
+        entity["id"] = issue_id(cats, kind)
+        cats[kind].append(entity)
+        entities.add(entity)
+
+        return entity["id"]
+
+
+# --------------------------------
+# 一括更新の操作内容の取り出し
+# --------------------------------
+# 操作は JSON の任意の値を含みうるため、型を確認してから使用する。
+# 不正な場合は ValueError を送出し、呼び出し側で 400 エラーとして返す
+
+def _op_str(op, key):
+    """
+    操作から文字列の項目を取り出す（未指定・文字列以外の場合は None）
+    """
+    value = op.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _op_name(op, n):
+    """
+    操作から名前を取り出す
+
+    :raises ValueError: 名前が未指定・空・文字列以外の場合
+    """
+    name = op.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{n}件目: 名前が空です。")
+    return name
+
+
+def _op_id(op, key, n):
+    """
+    操作からID（整数）を取り出す
+
+    :raises ValueError: 未指定・整数以外（真偽値を含む）の場合
+    """
+    value = op.get(key)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{n}件目: IDの指定が不正です。")
+    return value
@@ -1,14 +1,15 @@
 from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from control.categoryControl import CategoryControl
 from datetime import datetime
 from fastapi import HTTPException, Request, Query
-from util.dataLoader import load_posts, save_posts, load_categories, save_categories, get_post_detail_admin
+from util.dataLoader import (
+    load_posts, add_post, replace_post, remove_post,
+    load_categories, save_categories, get_post_detail_admin,
+    categories_lock, posts_lock,
+)
 from util.post_status import STATUS_PUBLIC, STATUS_PRIVATE, STATUS_DRAFT
-from services.post_list_service import build_post_list
-
-# Jinja2 テンプレート設定（管理者画面用）
-templates = Jinja2Templates(directory="templates")
+from services.post_list_service import build_post_list, render_category_filter
+from util.templates import templates
 
 
 class PostAdminControl:
@@ -51,8 +52,8 @@ class PostAdminControl:
             group_id=group_id,
         )
 
-        # カテゴリ関連データを取得
-        categories = load_categories()
+        # 絞り込みセレクトボックスの HTML を取得（カテゴリ情報が変わらない限りキャッシュを再利用）
+        category_filter_html = render_category_filter(category_id, topic_id, group_id)
 
         # 管理者用一覧テンプレートをレンダリング
         return templates.TemplateResponse(
@@ -61,10 +62,8 @@ class PostAdminControl:
                 "request": request,
                 **data,
 
-                # カテゴリ関連データ
-                "categories": categories["categories"],
-                "topics": categories["topics"],
-                "groups": categories["groups"],
+                # カテゴリ関連データ（絞り込みセレクトボックス）
+                "category_filter_html": category_filter_html,
 
                 # ステータス定数（テンプレート内判定用）
                 "STATUS_PUBLIC": STATUS_PUBLIC,
@@ -79,7 +78,8 @@ class PostAdminControl:
                 "category_id": category_id,
                 "topic_id": topic_id,
                 "group_id": group_id,
-                "query_params": dict(request.query_params),
+                "query_params": request.query_params,
+                "query_string": request.url.query,
             }
         )
 
@@ -145,49 +145,52 @@ class PostAdminControl:
 
         print("保存ステータス =", status)
 
-        # カテゴリ取得または新規作成
-        category_id = self.cat.add_or_get_category(
-            category_mode, category_id, new_category_name
-        )
-
         # カテゴリを新規作成した場合はトピックも新規扱い
         if category_mode == "new":
             topic_mode = "new"
 
-        # トピック取得または新規作成
-        topic_id = self.cat.add_or_get_topic(
-            topic_mode, topic_id, new_topic_name, category_id
-        )
+        # カテゴリ／トピック／グループのいずれかを新規作成するか
+        has_new = "new" in (category_mode, topic_mode, group_mode)
 
-        # グループ取得または新規作成
-        group_id = self.cat.add_or_get_group(
-            group_mode, group_id, new_group_name, topic_id
-        )
+        # 他のリクエストの変更を上書きしないよう、読み込みから保存までをロック内で行う
+        with categories_lock, posts_lock:
+            # 新規作成がある場合のみカテゴリ関連データを1回だけ読み込み、
+            # カテゴリ／トピック／グループの取得・新規作成をまとめて行う
+            cats = load_categories(for_update=True) if has_new else None
+            category_id, topic_id, group_id = self.cat.resolve_all(
+                cats,
+                category_mode, category_id, new_category_name,
+                topic_mode, topic_id, new_topic_name,
+                group_mode, group_id, new_group_name,
+            )
+
+            # 既存投稿を読み込む（ID採番のみに使用するため参照用で良い）
+            posts = load_posts()
 
-        # 既存投稿を読み込む
-        posts = load_posts()
+            # 新しい投稿IDを採番
+            new_id = posts[-1]["id"] + 1 if posts else 1
 
-        # 新しい投稿IDを採番
-        new_id = posts[-1]["id"] + 1 if posts else 1
+            # 作成日時を文字列で保存
+            now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-        # 作成日時を文字列で保存
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+            # 新規投稿データ
+            new_post = {
+                "id": new_id,
+                "title": title,
+                "content": content,
+                "category_id": category_id,
+                "topic_id": topic_id,
+                "group_id": group_id,
+                "status": status,
+                "created_at": now,
+            }
 
-        # 新規投稿データ
-        new_post = {
-            "id": new_id,
-            "title": title,
-            "content": content,
-            "category_id": category_id,
-            "topic_id": topic_id,
-            "group_id": group_id,
-            "status": status,
-            "created_at": now,
-        }
+            # 新規カテゴリ等がある場合のみカテゴリ情報を保存（1回だけ）
+            if has_new:
+                save_categories(cats)
 
-        # 投稿を追加して保存
-        posts.append(new_post)
-        save_posts(posts)
+            # 投稿を追加して保存（全件の書き直しは行わない）
+            add_post(new_post)
 
         # 投稿一覧へリダイレクト
         return RedirectResponse("/admin/posts", status_code=303)
@@ -199,9 +202,7 @@ class PostAdminControl:
         """
         投稿を削除する処理
         """
-        posts = load_posts()
-        posts = [p for p in posts if p["id"] != post_id]
-        save_posts(posts)
+        remove_post(post_id)
 
         return RedirectResponse("/admin/posts", status_code=303)
 
@@ -231,85 +232,59 @@ class PostAdminControl:
         new_topic_name = form.get("new_topic_name", "").strip()
         new_group_name = form.get("new_group_name", "").strip()
 
-        # 投稿・カテゴリ情報を読み込む
-        posts = load_posts()
-        cats = load_categories()
-
-        categories = cats["categories"]
-        topics = cats["topics"]
-        groups = cats["groups"]
-
-        # 更新対象の記事を取得
-        post = next((p for p in posts if p["id"] == post_id), None)
-        if not post:
-            raise HTTPException(status_code=404, detail="投稿が見つかりません。")
-
-        # -------------------------------------------------------
-        # カテゴリ処理
-        # -------------------------------------------------------
-        if category_mode == "new":
-            if new_category_name == "":
-                return self._error_response(request, post, cats, "カテゴリ名が空です。")
-            if any(c["name"].lower() == new_category_name.lower() for c in categories):
-                return self._error_response(request, post, cats, "既に同名カテゴリがあります。")
-
-            new_id = max([c["id"] for c in categories], default=0) + 1
-            categories.append({"id": new_id, "name": new_category_name})
-            category_id = new_id
-        else:
-            category_id = int(category_id)
-
-        # -------------------------------------------------------
-        # トピック処理
-        # -------------------------------------------------------
-        if topic_mode == "new":
-            if new_topic_name == "":
-                return self._error_response(request, post, cats, "トピック名が空です。")
-            if any(t["name"].lower() == new_topic_name.lower() for t in topics):
-                return self._error_response(request, post, cats, "既に同名トピックがあります。")
-
-            new_id = max([t["id"] for t in topics], default=0) + 1
-            topics.append({
-                "id": new_id,
-                "name": new_topic_name,
-                "category_id": category_id
-            })
-            topic_id = new_id
-        else:
-            topic_id = int(topic_id)
-
-        # -------------------------------------------------------
-        # グループ処理
-        # -------------------------------------------------------
-        if group_mode == "new":
-            if new_group_name == "":
-                return self._error_response(request, post, cats, "グループ名が空です。")
-            if any(g["name"].lower() == new_group_name.lower() for g in groups):
-                return self._error_response(request, post, cats, "既に同名グループがあります。")
-
-            new_id = max([g["id"] for g in groups], default=0) + 1
-            groups.append({
-                "id": new_id,
-                "name": new_group_name,
-                "topic_id": topic_id
-            })
-            group_id = new_id
-        else:
-            group_id = int(group_id)
-
-        # 投稿内容を更新
-        post["title"] = title
-        post["content"] = content
-        post["category_id"] = category_id
-        post["topic_id"] = topic_id
-        post["group_id"] = group_id
-
-        # 更新時は下書き状態に戻す
-        post["status"] = STATUS_DRAFT
-
-        # 更新内容を保存
-        save_posts(posts)
-        save_categories(cats)
+        # new 以外は既存IDの指定として扱う
+        category_mode = "new" if category_mode == "new" else "existing"
+        topic_mode = "new" if topic_mode == "new" else "existing"
+        group_mode = "new" if group_mode == "new" else "existing"
+
+        category_id = int(category_id) if category_mode == "existing" else None
+        topic_id = int(topic_id) if topic_mode == "existing" else None
+        group_id = int(group_id) if group_mode == "existing" else None
+
+        # カテゴリ／トピック／グループのいずれかを新規作成するか
+        has_new = "new" in (category_mode, topic_mode, group_mode)
+
+        # 他のリクエストの変更を上書きしないよう、読み込みから保存までをロック内で行う
+        with categories_lock, posts_lock:
+            # 投稿・カテゴリ情報を読み込む
+            # （カテゴリ情報は新規作成がある場合のみ書き換え用のコピーを取得する）
+            posts = load_posts()
+            cats = load_categories(for_update=True) if has_new else load_categories()
+
+            # 更新対象の記事を取得
+            post = posts.get(post_id)
+            if not post:
+                raise HTTPException(status_code=404, detail="投稿が見つかりません。")
+
+            # キャッシュ上の元データを汚さないよう、対象の記事だけコピーして更新する
+            post = post.copy()
+
+            # カテゴリ／トピック／グループの取得・新規作成をまとめて行う
+            try:
+                category_id, topic_id, group_id = self.cat.resolve_all(
+                    cats,
+                    category_mode, category_id, new_category_name,
+                    topic_mode, topic_id, new_topic_name,
+                    group_mode, group_id, new_group_name,
+                )
+            except ValueError as e:
+                # 名前が空・重複している場合は編集画面にエラーを表示
+                return self._error_response(request, post, cats, str(e))
+
+            # 投稿内容を更新
+            post["title"] = title
+            post["content"] = content
+            post["category_id"] = category_id
+            post["topic_id"] = topic_id
+            post["group_id"] = group_id
+
+            # 更新時は下書き状態に戻す
+            post["status"] = STATUS_DRAFT
+
+            # 更新内容を保存（カテゴリ情報は新規作成があった場合のみ）
+            if has_new:
+                save_categories(cats)
+            replace_post(post)
 
         return self._success_response(request, post, cats, "更新しました！")
 
@@ -1,11 +1,8 @@
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi import HTTPException, Request
-from util.dataLoader import load_posts, load_categories, get_post_detail_public
-from services.post_list_service import build_post_list
-
-# Jinja2 テンプレート設定（一般ユーザー向け画面）
-templates = Jinja2Templates(directory="templates")
+from util.dataLoader import get_post_detail_public
+from services.post_list_service import build_post_list, render_category_filter
+from util.templates import templates
 
 
 class PostPublicControl:
@@ -49,8 +46,8 @@ class PostPublicControl:
             public=True
         )
 
-        # カテゴリ・トピック・グループ情報を取得
-        categories = load_categories()
+        # 絞り込みセレクトボックスの HTML を取得（カテゴリ情報が変わらない限りキャッシュを再利用）
+        category_filter_html = render_category_filter(category_id, topic_id, group_id)
 
         # 記事一覧ページをレンダリング
         return templates.TemplateResponse(
@@ -59,10 +56,8 @@ class PostPublicControl:
                 "request": request,
                 **data,
 
-                # カテゴリ関連データ
-                "categories": categories["categories"],
-                "topics": categories["topics"],
-                "groups": categories["groups"],
+                # カテゴリ関連データ（絞り込みセレクトボックス）
+                "category_filter_html": category_filter_html,
 
                 # 状態保持用（ページ遷移・再検索用）
                 "page": page,
@@ -72,7 +67,7 @@ class PostPublicControl:
                 "category_id": category_id,
                 "topic_id": topic_id,
                 "group_id": group_id,
-                "query_params": dict(request.query_params),
+                "query_params": request.query_params,
                 "query_string": request.url.query,
             }
         )
@@ -87,9 +82,6 @@ class PostPublicControl:
             # 記事が存在しない場合は 404
             raise HTTPException(status_code=404)
 
-        # クエリパラメータを保持（一覧画面へ戻るため）
-        query_params = dict(request.query_params)
-
         # 記事詳細ページをレンダリング
         return templates.TemplateResponse(
             "post_detail_public.html",
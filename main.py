@@ -10,25 +10,44 @@ FastAPI アプリケーションのエントリーポイント
 """
 
 import os
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi import FastAPI, Request, Form, Depends, Query, HTTPException
+import hmac
+import logging
+import time
+import hashlib
+import secrets
+import threading
+from typing import Annotated
+from cachetools import LRUCache, TTLCache
+from pydantic import BeforeValidator
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response
+from fastapi import FastAPI, Request, Form, Query, HTTPException
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi import Body
 from dotenv import load_dotenv
 
 from control.postControlPublic import PostPublicControl
 from control.postControlAdmin import PostAdminControl
+from control.categoryControl import CategoryControl
 from services.post_service import toggle_status, get_related_posts
 from util.post_status import STATUS_PUBLIC, STATUS_PRIVATE, STATUS_DRAFT
+from util.categoryIndex import issue_id, name_key
+from util.templates import templates
 from util.dataLoader import (
     load_posts,
     load_categories,
     save_categories,
+    categories_lock,
+    rename_category_entity,
+    post_ids_by,
     load_topics_by_category,
     load_groups_by_topic,
     get_post_detail_public,
-    get_post_detail_admin,
+    get_categories_version,
+    is_cache_fresh,
+    warm_cache,
+    is_post_html_fresh,
+    warm_post_html,
 )
 
 # -----------------------------
@@ -36,26 +55,62 @@ from util.dataLoader import (
 # -----------------------------
 load_dotenv()
 
+# 起動時の設定に関する警告などを出力するロガー
+logger = logging.getLogger(__name__)
+
+# API の JSON レスポンスに使用するクラス
+# orjson（C 実装の高速な JSON ライブラリ）がインストールされていれば ORJSONResponse を使い、
+# 未インストールの場合は標準の json モジュールを使う JSONResponse で同じ内容を返す
+try:
+    import orjson  # noqa: F401（ORJSONResponse が内部で使用する）
+    from fastapi.responses import ORJSONResponse as APIJSONResponse
+except ImportError:
+    APIJSONResponse = JSONResponse
+
 # FastAPI アプリケーションのインスタンスを生成
-app = FastAPI()
+# ルートが dict / list をそのまま返した場合も APIJSONResponse で変換する
+app = FastAPI(default_response_class=APIJSONResponse)
 
 # 静的ファイル（CSS / JavaScript / 画像など）を配信するための設定
 # URL の /static にアクセスすると static ディレクトリ配下が参照される
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# このファイル自身の絶対パスを基準にしたベースディレクトリ
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# Jinja2 テンプレートの読み込み設定
-# templates ディレクトリ配下の HTML をレンダリングする
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
-
 # 一般ユーザー向けの記事制御クラスのインスタンス
 public_control = PostPublicControl()
 
 # 管理者向けの記事制御クラスのインスタンス
 post_admin = PostAdminControl()
 
+# カテゴリ／トピック／グループ制御クラスのインスタンス
+category_control = CategoryControl()
+
+# クエリパラメータの ID 用の型
+# 未指定や空文字（フォームの「すべて」選択時）の場合は None、それ以外は int に変換する
+# 変換・検証は FastAPI（Pydantic）側で行われる
+OptionalIdQuery = Annotated[int | None, Query(), BeforeValidator(lambda v: v or None)]
+
+
+async def ensure_cache():
+    """
+    投稿データ・カテゴリ情報のキャッシュを最新の状態にする
+
+    ファイル読み込みはイベントループを止めないようスレッドプールで行う。
+    キャッシュが最新の場合は何もせず、以降の処理はメモリ上のデータのみで完結する
+    """
+    if not is_cache_fresh():
+        await run_in_threadpool(warm_cache)
+
+
+async def ensure_post_html(post_id: int):
+    """
+    記事本文の HTML 変換結果をキャッシュ済みの状態にする
+
+    Markdown の変換は CPU 負荷が高くイベントループを止めてしまうため、
+    未変換・本文の更新後の場合のみスレッドプールで変換しておく
+    """
+    if not is_post_html_fresh(post_id):
+        await run_in_threadpool(warm_post_html, post_id)
+
 # ====================================
 # 一般ユーザー
 # ====================================
@@ -67,15 +122,15 @@ def root():
     return RedirectResponse("/posts")
 
 @app.get("/posts", response_class=HTMLResponse)
-def public_list(
+async def public_list(
     request: Request,
     page: int = Query(1, ge=1),                                     # ページ番号（1以上のみ許可）
     limit: int = Query(10, ge=1),                                   # 1ページあたりの表示件数
     sort: str = Query("created_desc"),                              # 並び順（作成日降順がデフォルト）
     q: str | None = Query(None),                                    # 検索キーワード
-    category_id: str | None = Query(None),                          # カテゴリID（文字列で受け取る）
-    topic_id: str | None = Query(None),                             # トピックID（文字列で受け取る）
-    group_id: str | None = Query(None),                             # グループID（文字列で受け取る）
+    category_id: OptionalIdQuery = None,                            # カテゴリID（空文字は未指定扱い）
+    topic_id: OptionalIdQuery = None,                               # トピックID（空文字は未指定扱い）
+    group_id: OptionalIdQuery = None,                               # グループID（空文字は未指定扱い）
 ):
     """
     一般ユーザー向けの記事一覧ページを表示する
@@ -83,16 +138,8 @@ def public_list(
     クエリパラメータによるページネーション、検索、
     カテゴリ／トピック／グループでの絞り込みに対応する
     """
-
-    # クエリパラメータのIDを int または None に正規化する
-    # 未指定や空文字の場合は None として扱う
-    def normalize_id(v):
-        return int(v) if v not in (None, "") else None
-
-    # 各IDパラメータを正規化
-    category_id = normalize_id(category_id)
-    topic_id = normalize_id(topic_id)
-    group_id = normalize_id(group_id)
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
 
     # 実際の記事取得・一覧生成処理は公開用コントローラに委譲
     return public_control.list_posts(
@@ -107,22 +154,28 @@ def public_list(
     )
 
 @app.get("/posts/{post_id}", response_class=HTMLResponse)
-def read_post_public(request: Request, post_id: int):
+async def read_post_public(request: Request, post_id: int):
     """
     一般ユーザー向けの記事詳細ページを表示する
 
     指定された post_id の記事を取得し、
     記事本文と関連記事を含めてテンプレートに渡す
     """
+    # ファイルの再読み込み・本文の HTML 変換が必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+    await ensure_post_html(post_id)
+
+    # 記事詳細と関連記事の取得で同じ投稿データを使う
+    posts = load_posts()
 
     # 公開状態の記事詳細を取得
-    post = get_post_detail_public(post_id)
+    post = get_post_detail_public(post_id, posts=posts)
     if not post:
         # 記事が存在しない場合は 404 エラーを返す
         raise HTTPException(status_code=404)
 
     # 現在の記事に関連する記事を取得
-    related_posts = get_related_posts(post)
+    related_posts = get_related_posts(post, posts=posts)
 
     # 記事詳細ページをレンダリングして返却
     return templates.TemplateResponse(
@@ -143,22 +196,131 @@ def read_post_public(request: Request, post_id: int):
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 
+# 管理者セッション Cookie の署名に使う秘密鍵
+# 未設定の場合は起動ごとにランダムに生成する。
+# この場合、再起動（--reload を含む）のたびにログインし直しになり、
+# 複数ワーカー（--workers）で起動するとワーカーごとに鍵が異なるためログインできなくなる
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    logger.warning(
+        "SESSION_SECRET が設定されていないため、管理者セッションの署名鍵を起動ごとに生成します。"
+        "複数ワーカーで起動する場合や再起動後もログイン状態を保つ場合は .env に SESSION_SECRET を設定してください。"
+    )
+    SESSION_SECRET = secrets.token_hex(32)
+SESSION_SECRET = SESSION_SECRET.encode()
+
+# 管理者セッションの有効期限（秒）
+SESSION_MAX_AGE = 60 * 60
+
+# HTTPS で運用する場合は COOKIE_SECURE=1 を指定し、Cookie を HTTPS 通信でのみ送信させる
+COOKIE_SECURE = os.getenv("COOKIE_SECURE", "0") == "1"
+
+
+def _sign_session(expires: str):
+    """
+    有効期限（UNIX 時刻の10進文字列）に対する管理者セッションの署名（HMAC-SHA256）を返す
+    """
+    return hmac.new(SESSION_SECRET, f"admin:{expires}".encode(), hashlib.sha256).hexdigest()
+
 
-def verify_admin(request: Request):
+def _issue_session_token():
     """
-    管理者としてログイン済みかを確認する依存関数
+    ログイン成功時に Cookie へ保存する管理者セッションのトークンを作成する
 
-    Cookie に保存されている admin_session を確認し、
-    未ログインの場合はログイン画面へリダイレクトする
+    :return: "有効期限（UNIX 時刻）.署名" 形式の文字列
     """
-    # 管理者セッション Cookie を取得
-    session = request.cookies.get("admin_session")
-    if session != "valid":
-        # 未ログイン時はログイン画面へ遷移
-        raise HTTPException(
-            status_code=303,
-            headers={"Location": "/admin/login"}
-        )
+    expires = str(int(time.time()) + SESSION_MAX_AGE)
+    return f"{expires}.{_sign_session(expires)}"
+
+
+# 有効期限部分の最大桁数（UNIX 時刻として十分な桁数）
+# Cookie はクライアントが自由に設定できるため、極端に長い値は数値に変換する前に弾く
+SESSION_EXPIRES_MAX_DIGITS = 12
+
+
+def _is_valid_session(token: str | None):
+    """
+    管理者セッションのトークンが正しく、有効期限内か判定する
+
+    - 署名は Cookie の文字列のまま作り直し、hmac.compare_digest で比較する
+      （比較時間から内容を推測されないようにする）
+    - 数値への変換は署名が一致した後にのみ行う
+    """
+    if not token:
+        return False
+
+    expires, _, signature = token.partition(".")
+
+    # 有効期限は ASCII の数字のみ・一定桁数以内に限る
+    if not (0 < len(expires) <= SESSION_EXPIRES_MAX_DIGITS
+            and expires.isascii() and expires.isdigit()):
+        return False
+
+    if not hmac.compare_digest(signature.encode(), _sign_session(expires).encode()):
+        return False
+
+    return int(expires) > time.time()
+
+
+# ログインせずにアクセスできる管理者向けパス
+ADMIN_PUBLIC_PATHS = ("/admin/login", "/admin/logout")
+
+
+def _route_path(scope):
+    """
+    ルーティングの判定に使うパス（root_path を除いたパス）を返す
+
+    ASGI では scope["path"] に root_path（リバースプロキシ配下で動かす場合の接頭辞）が含まれるため、
+    そのまま判定すると /blog/admin/... のようなパスが管理者向けと判定されない。
+    Starlette のルーティングと同じく root_path を取り除いたパスで判定する
+    """
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+
+    if not root_path or not path.startswith(root_path):
+        return path
+    if path == root_path:
+        return ""
+    if path[len(root_path)] == "/":
+        return path[len(root_path):]
+    return path
+
+
+class AdminAuthMiddleware:
+    """
+    管理者向けページ（/admin/ 配下）へのアクセス時にログイン済みかを確認するミドルウェア
+
+    Cookie に保存されている admin_session（署名付きトークン）を確認し、
+    未ログインの場合はルーティング処理に入る前にログイン画面へリダイレクトする
+    （例外を送出せずにレスポンスを直接返す）
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # HTTP 以外（lifespan など）と管理者向け以外のパスはそのまま処理する
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = _route_path(scope)
+        if not path.startswith("/admin/") or path in ADMIN_PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # 管理者セッション Cookie を確認
+        request = Request(scope)
+        if not _is_valid_session(request.cookies.get("admin_session")):
+            # 未ログイン時はログイン画面へ遷移
+            response = RedirectResponse("/admin/login", status_code=303)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(AdminAuthMiddleware)
 
 
 @app.get("/admin/login", response_class=HTMLResponse)
@@ -180,8 +342,63 @@ def admin_login_page(request: Request, error: str | None = None):
 # ログイン失敗回数の上限
 FAILED_LOGIN_LIMIT = 5
 
-# IP アドレスごとのログイン失敗回数を保持する辞書
-failed_login_count = {}
+# ログイン失敗回数を保持する期間（秒）
+# 最後の失敗からこの時間が経過すると失敗回数は自動的に破棄される
+FAILED_LOGIN_TTL = 60 * 15
+
+# IP アドレスごとのログイン失敗回数を保持するキャッシュ
+# 保持件数と保持期間に上限を設け、古い IP アドレスは自動的に削除する
+failed_login_count = TTLCache(maxsize=10000, ttl=FAILED_LOGIN_TTL)
+
+# failed_login_count はスレッドプール上の複数リクエストから更新されるため排他制御する
+failed_login_lock = threading.Lock()
+
+# ログイン制限中に返す画面の HTML（base_url ごとに1回だけ描画して使い回す）
+# ※ テンプレート内の url_for がリクエストの base_url に依存するためキーにしている
+# ※ base_url はクライアントが送る Host ヘッダーから作られるため、保持件数に上限を設ける
+_rate_limited_html = LRUCache(maxsize=16)
+
+# _rate_limited_html は参照時にも内部の順序が更新されるため、参照・追加とも排他制御する
+_rate_limited_lock = threading.Lock()
+
+
+def _rate_limited_response(request: Request):
+    """
+    ログイン制限中のレスポンスを返す
+
+    大量の試行を受けた場合でも毎回テンプレートを描画しないよう、
+    描画済みの HTML をそのまま返す
+    """
+    key = str(request.base_url)
+    with _rate_limited_lock:
+        body = _rate_limited_html.get(key)
+
+    if body is None:
+        body = templates.get_template("admin/login.html").render({
+            "request": request,
+            "error": "ログイン試行回数が多すぎます。しばらく待ってください。",
+        })
+        with _rate_limited_lock:
+            _rate_limited_html[key] = body
+
+    return HTMLResponse(body, status_code=403)
+
+
+def _is_valid_admin(username: str, password: str):
+    """
+    管理者のユーザーID・パスワードと一致するか判定する
+
+    比較にかかる時間から内容を推測されないよう、hmac.compare_digest で比較する
+    """
+    # 比較は常に両方行い、ユーザーIDの一致だけで処理時間が変わらないようにする
+    username_ok = hmac.compare_digest(username.encode(), (ADMIN_USERNAME or "").encode())
+    password_ok = hmac.compare_digest(password.encode(), (ADMIN_PASSWORD or "").encode())
+
+    # 管理者アカウントが未設定の場合はログイン不可
+    if not ADMIN_USERNAME or not ADMIN_PASSWORD:
+        return False
+
+    return username_ok and password_ok
 
 
 @app.post("/admin/login")
@@ -195,24 +412,19 @@ def admin_login(request: Request, username: str = Form(...), password: str = For
     # クライアントの IP アドレスを取得
     ip = request.client.host
 
-    # 初回アクセス時は失敗回数を 0 で初期化
-    failed_login_count.setdefault(ip, 0)
+    # 現在の失敗回数を取得（記録が無い・期限切れの場合は 0）
+    with failed_login_lock:
+        failed_count = failed_login_count.get(ip, 0)
 
     # 失敗回数が上限を超えている場合はログイン不可
-    if failed_login_count[ip] >= FAILED_LOGIN_LIMIT:
-        return templates.TemplateResponse(
-            "admin/login.html",
-            {
-                "request": request,
-                "error": "ログイン試行回数が多すぎます。しばらく待ってください。",
-            },
-            status_code=403,
-        )
+    if failed_count >= FAILED_LOGIN_LIMIT:
+        return _rate_limited_response(request)
 
     # 認証成功時の処理
-    if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+    if _is_valid_admin(username, password):
         # 失敗回数をリセット
-        failed_login_count[ip] = 0
+        with failed_login_lock:
+            failed_login_count.pop(ip, None)
 
         # 管理者投稿一覧へリダイレクト
         res = RedirectResponse("/admin/posts", status_code=303)
@@ -220,15 +432,17 @@ def admin_login(request: Request, username: str = Form(...), password: str = For
         # 管理者ログイン状態を示す Cookie を設定
         res.set_cookie(
             "admin_session",
-            "valid",
-            max_age=60 * 60,   # 有効期限（1時間）
-            httponly=True,     # JavaScript から参照不可
-            samesite="lax",    # CSRF 対策
+            _issue_session_token(),   # 有効期限付きの署名済みトークン
+            max_age=SESSION_MAX_AGE,  # 有効期限（1時間）
+            httponly=True,            # JavaScript から参照不可
+            samesite="lax",           # CSRF 対策
+            secure=COOKIE_SECURE,     # HTTPS 運用時は HTTPS 通信でのみ送信
         )
         return res
 
-    # 認証失敗時は失敗回数を加算
-    failed_login_count[ip] += 1
+    # 認証失敗時は失敗回数を加算（保持期間もここから数え直す）
+    with failed_login_lock:
+        failed_login_count[ip] = failed_login_count.get(ip, 0) + 1
 
     # エラーメッセージ付きでログイン画面を再表示
     return templates.TemplateResponse(
@@ -261,16 +475,15 @@ def admin_logout():
 # 管理者：投稿一覧（ページネーション対応）
 # ====================================
 @app.get("/admin/posts", response_class=HTMLResponse)
-def admin_list(
+async def admin_list(
     request: Request,
-    admin: None = Depends(verify_admin),
     page: int = Query(1),                                           # ページ番号（クエリパラメータ）
     limit: int = Query(10),                                         # 1ページあたりの表示件数
     sort: str = Query("created_desc"),                              # 並び順（作成日降順）
     q: str | None = None,                                           # 検索キーワード
-    category_id: str | None = Query(None),                          # カテゴリID（文字列）
-    topic_id: str | None = Query(None),                             # トピックID（文字列）
-    group_id: str | None = Query(None),                             # グループID（文字列）
+    category_id: OptionalIdQuery = None,                            # カテゴリID（空文字は未指定扱い）
+    topic_id: OptionalIdQuery = None,                               # トピックID（空文字は未指定扱い）
+    group_id: OptionalIdQuery = None,                               # グループID（空文字は未指定扱い）
 ):
     """
     管理者向けの記事一覧ページを表示する
@@ -278,15 +491,8 @@ def admin_list(
     - 下書き・非公開記事も含めて一覧表示
     - ページネーション、検索、カテゴリ／トピック／グループ絞り込みに対応
     """
-
-    # クエリパラメータのIDを int または None に正規化する
-    def normalize_id(v):
-        return int(v) if v not in (None, "") else None
-
-    # 各IDを正規化
-    category_id = normalize_id(category_id)
-    topic_id = normalize_id(topic_id)
-    group_id = normalize_id(group_id)
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
 
     # 実際の記事一覧取得処理は管理者用コントローラに委譲
     return post_admin.list_posts(
@@ -305,13 +511,16 @@ def admin_list(
 # ====================================
 
 @app.get("/admin/posts/new", response_class=HTMLResponse)
-def new_post_form(request: Request, admin=Depends(verify_admin)):
+async def new_post_form(request: Request):
     """
     新規投稿作成フォームを表示する（管理者専用）
 
     事前にカテゴリ・トピック・グループ情報を読み込み、
     入力フォームで選択できるようにする
     """
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+
     # カテゴリ・トピック・グループ情報を読み込む
     cats = load_categories()
 
@@ -334,7 +543,6 @@ def create_post(
     group_mode: str = Form(...),            # 既存グループ or 新規グループ選択
     group_id: int | None = Form(None),      # 既存グループID
     new_group_name: str | None = Form(None),# 新規グループ名
-    admin=Depends(verify_admin),
 ):
     """
     新規投稿を作成する処理（管理者専用）
@@ -362,12 +570,15 @@ def create_post(
 # カテゴリ管理ページ（1画面）
 # ====================================
 @app.get("/admin/posts/category_manage", response_class=HTMLResponse)
-def show_category_manage(request: Request, admin: None = Depends(verify_admin)):
+async def show_category_manage(request: Request):
     """
     カテゴリ・トピック・グループを一括で管理する画面を表示する（管理者専用）
 
     1画面でカテゴリ／トピック／グループの一覧・編集・削除を行う想定
     """
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+
     # 現在登録されているカテゴリ関連データをすべて読み込む
     cats = load_categories()
 
@@ -383,29 +594,76 @@ def show_category_manage(request: Request, admin: None = Depends(verify_admin)):
     )
 
 
+def _category_etag(kind: str, parent_id: int):
+    """
+    カテゴリ情報から作る API レスポンス用の ETag を返す
+
+    categories.json の更新時刻（get_categories_version）と対象IDから作るため、
+    カテゴリ情報が保存されるまで同じ値になる
+    """
+    version = get_categories_version() or 0
+    return f'W/"{version:x}-{kind}-{parent_id}"'
+
+
+def _json_with_etag(request: Request, etag: str, load):
+    """
+    ETag 付きの JSON レスポンスを返す
+
+    リクエストの If-None-Match が ETag と一致する場合は、
+    データの取得・JSON 変換を行わずに 304（本文なし）を返す
+
+    :param etag: _category_etag で作成した ETag
+    :param load: レスポンスにするデータを返す関数
+    """
+    # 毎回ブラウザに再検証させる（一致すれば 304 で本文を省略できる）
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    return APIJSONResponse(load(), headers=headers)
+
+
 # -----------------------------
 # API：カテゴリ → トピック一覧
 # -----------------------------
 @app.get("/admin/api/topics")
-def api_get_topics(category_id: int = Query(...), admin: None = Depends(verify_admin)):
+async def api_get_topics(request: Request, category_id: int = Query(...)):
     """
     指定されたカテゴリに紐づくトピック一覧を返す API（管理者専用）
 
     カテゴリ選択時の動的UI更新用
+    カテゴリ情報が変更されていなければ 304 を返す
     """
-    return JSONResponse(load_topics_by_category(category_id))
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+
+    return _json_with_etag(
+        request,
+        _category_etag("topics", category_id),
+        lambda: load_topics_by_category(category_id),
+    )
 
 # -----------------------------
 # API：トピック → グループ一覧
 # -----------------------------
 @app.get("/admin/api/groups")
-def api_get_groups(topic_id: int = Query(...), admin: None = Depends(verify_admin)):
+async def api_get_groups(request: Request, topic_id: int = Query(...)):
     """
     指定されたトピックに紐づくグループ一覧を返す API（管理者専用）
 
     トピック選択時の動的UI更新用
+    カテゴリ情報が変更されていなければ 304 を返す
     """
-    return JSONResponse(load_groups_by_topic(topic_id))
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+
+    return _json_with_etag(
+        request,
+        _category_etag("groups", topic_id),
+        lambda: load_groups_by_topic(topic_id),
+    )
 
 # -----------------------------
 # API：カテゴリ作成
@@ -415,42 +673,42 @@ def api_create_category(
     category_name: str = Form(...),   # 新規カテゴリ名
     topic_name: str = Form(""),       # 新規トピック名（任意）
     group_name: str = Form(""),       # 新規グループ名（任意）
-    admin: None = Depends(verify_admin),
 ):
     """
     カテゴリを新規作成する API（管理者専用）
 
     必要に応じて、同時にトピック・グループも作成する
     """
-    # 現在のカテゴリ・トピック・グループ情報を読み込む
-    cats = load_categories()
-
-    # カテゴリ作成
-    # 既存IDの最大値 + 1 を新しいカテゴリIDとする
-    new_cat_id = max([c["id"] for c in cats["categories"]], default=0) + 1
-    cats["categories"].append({"id": new_cat_id, "name": category_name})
-
-    # トピック作成（任意）
-    new_topic_id = None
-    if topic_name:
-        # 新規トピックIDを採番
-        new_topic_id = max([t["id"] for t in cats["topics"]], default=0) + 1
-        cats["topics"].append(
-            {"id": new_topic_id, "name": topic_name, "category_id": new_cat_id}
-        )
-
-    # グループ作成（任意）
-    # トピックが作成された場合のみグループを作成する
-    if group_name and new_topic_id:
-        new_group_id = max([g["id"] for g in cats["groups"]], default=0) + 1
-        cats["groups"].append(
-            {"id": new_group_id, "name": group_name, "topic_id": new_topic_id}
-        )
-
-    # 更新後のカテゴリ情報を保存
-    save_categories(cats)
-
-    return JSONResponse({"status": "ok"})
+    with categories_lock:
+        # 現在のカテゴリ・トピック・グループ情報を読み込む
+        cats = load_categories(for_update=True)
+
+        # カテゴリ作成
+        # 採番カウンタを進めて新しいカテゴリIDとする
+        new_cat_id = issue_id(cats, "categories")
+        cats["categories"].append({"id": new_cat_id, "name": category_name, "name_lower": name_key(category_name)})
+
+        # トピック作成（任意）
+        new_topic_id = None
+        if topic_name:
+            # 新規トピックIDを採番
+            new_topic_id = issue_id(cats, "topics")
+            cats["topics"].append(
+                {"id": new_topic_id, "name": topic_name, "name_lower": name_key(topic_name), "category_id": new_cat_id}
+            )
+
+        # グループ作成（任意）
+        # トピックが作成された場合のみグループを作成する
+        if group_name and new_topic_id:
+            new_group_id = issue_id(cats, "groups")
+            cats["groups"].append(
+                {"id": new_group_id, "name": group_name, "name_lower": name_key(group_name), "topic_id": new_topic_id}
+            )
+
+        # 更新後のカテゴリ情報を保存
+        save_categories(cats)
+
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------
@@ -460,67 +718,65 @@ def api_create_category(
 def api_update_category(
     category_id: int = Form(...),  # 更新対象のカテゴリID
     name: str = Form(...),         # 新しいカテゴリ名
-    admin: None = Depends(verify_admin),
 ):
     """
     カテゴリ名を更新する API（管理者専用）
     """
-    # カテゴリ情報を読み込む
-    cats = load_categories()
-
-    # 対象カテゴリを検索して名前を更新
-    for c in cats["categories"]:
-        if c["id"] == category_id:
-            c["name"] = name
-            break
+    # 対象カテゴリを ID で取得して名前を更新し、保存する
+    rename_category_entity("categories", category_id, name)
 
-    # 更新内容を保存
-    save_categories(cats)
-
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------------------
 # API：カテゴリ削除（配下も削除）
 # -----------------------------------------
 @app.post("/admin/api/category_delete")
-def api_delete_category(category_id: int = Form(...), admin: None = Depends(verify_admin)):
+def api_delete_category(category_id: int = Form(...)):
     """
     カテゴリを削除する API（管理者専用）
 
     - 記事で使用されているカテゴリは削除不可
     - 削除時は配下のトピック・グループも同時に削除する
     """
-    # カテゴリ情報と記事一覧を読み込む
-    cats = load_categories()
-    posts = load_posts()
-
-    # 投稿で使用されているかチェック
-    used = any(p.get("category_id") == category_id for p in posts)
-    if used:
-        # 使用中の場合はエラーを返す
-        return JSONResponse(
-            {"status": "error", "message": "このカテゴリを使用している記事があるため削除できません。"},
-            status_code=400,   # クライアント側で判定しやすいようにエラーコードを返す
-        )
-
-    # --- 使用されていなければ削除 ---
-    # カテゴリを削除
-    cats["categories"] = [c for c in cats["categories"] if c["id"] != category_id]
-
-    # 配下のトピックIDを取得
-    deleted_topics = [t["id"] for t in cats["topics"] if t["category_id"] == category_id]
-
-    # トピックを削除
-    cats["topics"] = [t for t in cats["topics"] if t["category_id"] != category_id]
-
-    # トピックに紐づくグループも削除
-    cats["groups"] = [g for g in cats["groups"] if g["topic_id"] not in deleted_topics]
-
-    # 更新内容を保存
-    save_categories(cats)
-
-    return JSONResponse({"status": "ok"})
+    with categories_lock:
+        # カテゴリ情報と記事一覧を読み込む
+        cats = load_categories(for_update=True)
+        posts = load_posts()
+
+        # 投稿で使用されているかチェック（インデックスで該当投稿の有無のみ確認する）
+        used = bool(post_ids_by(posts, "category_id", category_id))
+        if used:
+            # 使用中の場合はエラーを返す
+            return APIJSONResponse(
+                {"status": "error", "message": "このカテゴリを使用している記事があるため削除できません。"},
+                status_code=400,   # クライアント側で判定しやすいようにエラーコードを返す
+            )
+
+        # --- 使用されていなければ削除 ---
+        # カテゴリを削除
+        cats["categories"] = [c for c in cats["categories"] if c["id"] != category_id]
+
+        # 配下のトピックを1回の走査で振り分ける（削除対象のIDは set で保持する）
+        deleted_topics = set()
+        remaining_topics = []
+        for t in cats["topics"]:
+            if t["category_id"] == category_id:
+                deleted_topics.add(t["id"])
+            else:
+                remaining_topics.append(t)
+
+        # トピックを削除
+        cats["topics"] = remaining_topics
+
+        # トピックに紐づくグループも削除
+        if deleted_topics:
+            cats["groups"] = [g for g in cats["groups"] if g["topic_id"] not in deleted_topics]
+
+        # 更新内容を保存
+        save_categories(cats)
+
+    return APIJSONResponse({"status": "ok"})
 
 # -----------------------------
 # API：トピック作成
@@ -529,28 +785,28 @@ def api_delete_category(category_id: int = Form(...), admin: None = Depends(veri
 def api_create_topic(
     category_id: int = Form(...),  # 紐づけるカテゴリID
     name: str = Form(...),         # 新規トピック名
-    admin: None = Depends(verify_admin),
 ):
     """
     トピックを新規作成する API（管理者専用）
 
     指定されたカテゴリに紐づくトピックを追加する
     """
-    # カテゴリ情報を読み込む
-    cats = load_categories()
+    with categories_lock:
+        # カテゴリ情報を読み込む
+        cats = load_categories(for_update=True)
 
-    # 新しいトピックIDを採番（最大ID + 1）
-    new_topic_id = max([t["id"] for t in cats["topics"]], default=0) + 1
+        # 新しいトピックIDを採番
+        new_topic_id = issue_id(cats, "topics")
 
-    # トピックを追加
-    cats["topics"].append(
-        {"id": new_topic_id, "name": name, "category_id": category_id}
-    )
+        # トピックを追加
+        cats["topics"].append(
+            {"id": new_topic_id, "name": name, "name_lower": name_key(name), "category_id": category_id}
+        )
 
-    # 更新内容を保存
-    save_categories(cats)
+        # 更新内容を保存
+        save_categories(cats)
 
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------
@@ -560,59 +816,50 @@ def api_create_topic(
 def api_update_topic(
     topic_id: int = Form(...),  # 更新対象のトピックID
     name: str = Form(...),      # 新しいトピック名
-    admin: None = Depends(verify_admin),
 ):
     """
     トピック名を更新する API（管理者専用）
     """
-    # カテゴリ情報を読み込む
-    cats = load_categories()
-
-    # 対象トピックを検索して名前を更新
-    for t in cats["topics"]:
-        if t["id"] == topic_id:
-            t["name"] = name
-            break
+    # 対象トピックを ID で取得して名前を更新し、保存する
+    rename_category_entity("topics", topic_id, name)
 
-    # 更新内容を保存
-    save_categories(cats)
-
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------------------
 # API：トピック削除（配下グループも削除）
 # -----------------------------------------
 @app.post("/admin/api/topic_delete")
-def api_delete_topic(topic_id: int = Form(...), admin: None = Depends(verify_admin)):
+def api_delete_topic(topic_id: int = Form(...)):
     """
     トピックを削除する API（管理者専用）
 
     - 記事で使用されているトピックは削除不可
     - 削除時は配下のグループも同時に削除する
     """
-    # カテゴリ情報と記事一覧を読み込む
-    cats = load_categories()
-    posts = load_posts()
+    with categories_lock:
+        # カテゴリ情報と記事一覧を読み込む
+        cats = load_categories(for_update=True)
+        posts = load_posts()
 
-    # 投稿で使用されているかチェック
-    used = any(p.get("topic_id") == topic_id for p in posts)
-    if used:
-        return JSONResponse(
-            {"status": "error", "message": "このトピックを使用している記事があるため削除できません。"},
-            status_code=400,   # 使用中のため削除不可
-        )
+        # 投稿で使用されているかチェック（インデックスで該当投稿の有無のみ確認する）
+        used = bool(post_ids_by(posts, "topic_id", topic_id))
+        if used:
+            return APIJSONResponse(
+                {"status": "error", "message": "このトピックを使用している記事があるため削除できません。"},
+                status_code=400,   # 使用中のため削除不可
+            )
 
-    # トピックを削除
-    cats["topics"] = [t for t in cats["topics"] if t["id"] != topic_id]
+        # トピックを削除
+        cats["topics"] = [t for t in cats["topics"] if t["id"] != topic_id]
 
-    # トピックに紐づくグループも削除
-    cats["groups"] = [g for g in cats["groups"] if g["topic_id"] != topic_id]
+        # トピックに紐づくグループも削除
+        cats["groups"] = [g for g in cats["groups"] if g["topic_id"] != topic_id]
 
-    # 更新内容を保存
-    save_categories(cats)
+        # 更新内容を保存
+        save_categories(cats)
 
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------
@@ -622,28 +869,28 @@ def api_delete_topic(topic_id: int = Form(...), admin: None = Depends(verify_adm
 def api_create_group(
     topic_id: int = Form(...),  # 紐づけるトピックID
     name: str = Form(...),      # 新規グループ名
-    admin: None = Depends(verify_admin),
 ):
     """
     グループを新規作成する API（管理者専用）
 
     指定されたトピックに紐づくグループを追加する
     """
-    # カテゴリ情報を読み込む
-    cats = load_categories()
+    with categories_lock:
+        # カテゴリ情報を読み込む
+        cats = load_categories(for_update=True)
 
-    # 新しいグループIDを採番（最大ID + 1）
-    new_group_id = max([g["id"] for g in cats["groups"]], default=0) + 1
+        # 新しいグループIDを採番
+        new_group_id = issue_id(cats, "groups")
 
-    # グループを追加
-    cats["groups"].append(
-        {"id": new_group_id, "name": name, "topic_id": topic_id}
-    )
+        # グループを追加
+        cats["groups"].append(
+            {"id": new_group_id, "name": name, "name_lower": name_key(name), "topic_id": topic_id}
+        )
 
-    # 更新内容を保存
-    save_categories(cats)
+        # 更新内容を保存
+        save_categories(cats)
 
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------
@@ -653,80 +900,114 @@ def api_create_group(
 def api_update_group(
     group_id: int = Form(...),  # 更新対象のグループID
     name: str = Form(...),      # 新しいグループ名
-    admin: None = Depends(verify_admin),
 ):
     """
     グループ名を更新する API（管理者専用）
     """
-    # カテゴリ情報を読み込む
-    cats = load_categories()
-
-    # 対象グループを検索して名前を更新
-    for g in cats["groups"]:
-        if g["id"] == group_id:
-            g["name"] = name
-            break
-
-    # 更新内容を保存
-    save_categories(cats)
+    # 対象グループを ID で取得して名前を更新し、保存する
+    rename_category_entity("groups", group_id, name)
 
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
 
 
 # -----------------------------------------
 # API：グループ削除
 # -----------------------------------------
 @app.post("/admin/api/group_delete")
-def api_delete_group(group_id: int = Form(...), admin: None = Depends(verify_admin)):
+def api_delete_group(group_id: int = Form(...)):
     """
     グループを削除する API（管理者専用）
 
     記事で使用されているグループは削除不可
     """
-    # カテゴリ情報と記事一覧を読み込む
-    cats = load_categories()
-    posts = load_posts()
+    with categories_lock:
+        # カテゴリ情報と記事一覧を読み込む
+        cats = load_categories(for_update=True)
+        posts = load_posts()
 
-    # 投稿で使用されているかチェック
-    used = any(p.get("group_id") == group_id for p in posts)
-    if used:
-        return JSONResponse(
-            {"status": "error", "message": "このグループを使用している記事があるため削除できません。"},
-            status_code=400,   # 使用中のため削除不可
-        )
+        # 投稿で使用されているかチェック（インデックスで該当投稿の有無のみ確認する）
+        used = bool(post_ids_by(posts, "group_id", group_id))
+        if used:
+            return APIJSONResponse(
+                {"status": "error", "message": "このグループを使用している記事があるため削除できません。"},
+                status_code=400,   # 使用中のため削除不可
+            )
 
-    # グループを削除
-    cats["groups"] = [g for g in cats["groups"] if g["id"] != group_id]
+        # グループを削除
+        cats["groups"] = [g for g in cats["groups"] if g["id"] != group_id]
 
-    # 更新内容を保存
-    save_categories(cats)
+        # 更新内容を保存
+        save_categories(cats)
 
-    return JSONResponse({"status": "ok"})
+    return APIJSONResponse({"status": "ok"})
+
+
+# -----------------------------------------
+# API：カテゴリ／トピック／グループ一括更新
+# -----------------------------------------
+@app.post("/admin/api/category_batch")
+def api_category_batch(ops: list[dict] = Body(...)):
+    """
+    カテゴリ／トピック／グループの作成・名前変更・削除をまとめて行う API（管理者専用）
+
+    - 読み込みと保存はそれぞれ1回だけ行う
+    - いずれかの操作でエラーになった場合は何も保存しない
+    - 操作の形式は CategoryControl.apply_batch を参照
+    """
+    with categories_lock:
+        # カテゴリ情報と記事一覧を読み込む
+        cats = load_categories(for_update=True)
+        posts = load_posts()
+
+        # すべての操作をメモリ上で適用する
+        try:
+            results = category_control.apply_batch(cats, posts, ops)
+        except ValueError as e:
+            # 1件でも失敗した場合は変更を破棄してエラーを返す
+            return APIJSONResponse(
+                {"status": "error", "message": str(e)},
+                status_code=400,
+            )
+
+        # 更新内容をまとめて保存
+        save_categories(cats)
+
+    return APIJSONResponse({"status": "ok", "ids": results})
 
 # ====================================
 # 管理者：投稿詳細・編集・削除
 # ====================================
 
 @app.get("/admin/posts/{post_id}", response_class=HTMLResponse)
-def read_post_admin(request: Request, post_id: int, admin=Depends(verify_admin)):
+async def read_post_admin(request: Request, post_id: int):
     """
     管理者向けの記事詳細ページを表示する
 
     下書き・非公開を含む記事の詳細情報を取得して表示する
     """
+    # ファイルの再読み込み・本文の HTML 変換が必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+    await ensure_post_html(post_id)
+
     # 管理者用の記事詳細取得処理をコントローラに委譲
     return post_admin.post_detail_admin(request, post_id)
 
 
 @app.get("/admin/posts/{post_id}/edit", response_class=HTMLResponse)
-def edit_post_admin(request: Request, post_id: int, admin=Depends(verify_admin)):
+async def edit_post_admin(request: Request, post_id: int):
     """
     管理者向けの記事編集画面を表示する
 
     編集対象の記事情報と、カテゴリ／トピック／グループ一覧を読み込む
     """
-    # 管理者用の記事詳細を取得
-    post = get_post_detail_admin(post_id)
+    # ファイルの再読み込みが必要な場合はスレッドプールで先に済ませる
+    await ensure_cache()
+
+    # 編集対象の記事を ID で取得
+    # （編集画面は元の値のみを使うため、名前の付与や HTML 変換は行わない）
+    post = load_posts().get(post_id)
+    if not post:
+        raise HTTPException(status_code=404)
 
     # カテゴリ・トピック・グループ情報を取得
     cats = load_categories()
@@ -748,7 +1029,6 @@ def edit_post_admin(request: Request, post_id: int, admin=Depends(verify_admin))
 async def update_post_admin(
     request: Request,
     post_id: int,
-    admin=Depends(verify_admin),
 ):
     """
     記事編集内容を保存する処理（管理者専用）
@@ -759,11 +1039,12 @@ async def update_post_admin(
     form = await request.form()
 
     # 実際の更新処理は管理者用コントローラに委譲
-    return post_admin.update_post(request, post_id, form)
+    # ※ ファイルの読み書きを伴うため、イベントループを止めないようスレッドプールで実行する
+    return await run_in_threadpool(post_admin.update_post, request, post_id, form)
 
 
 @app.post("/admin/posts/{post_id}/delete")
-def delete_post_admin(request: Request, post_id: int, admin=Depends(verify_admin)):
+def delete_post_admin(request: Request, post_id: int):
     """
     記事を削除する処理（管理者専用）
     """
@@ -775,7 +1056,6 @@ def delete_post_admin(request: Request, post_id: int, admin=Depends(verify_admin
 def api_update_post_status(
     post_id: int,
     payload: dict = Body(...),
-    admin=Depends(verify_admin),
 ):
     """
     記事の公開ステータスを更新する API（管理者専用）
@@ -787,7 +1067,7 @@ def api_update_post_status(
 
     # 不正なステータス値はエラーとする
     if status not in ("public", "private"):
-        return JSONResponse(
+        return APIJSONResponse(
             {"message": "invalid status"},
             status_code=400
         )
@@ -795,4 +1075,4 @@ def api_update_post_status(
     # ステータス更新処理（失敗しても例外は投げない）
     toggle_status(post_id, status)
 
-    return JSONResponse({"ok": True})
+    return APIJSONResponse({"ok": True})
@@ -1,4 +1,8 @@
-from util.dataLoader import load_posts, load_categories
+import heapq
+from collections import ChainMap
+from functools import lru_cache
+from util.dataLoader import load_posts, load_categories, load_name_maps, get_categories_version, search_post_ids
+from util.templates import templates
 from math import ceil
 
 
@@ -22,75 +26,54 @@ def build_post_list(
     # =========================
     # ① データ読み込み
     # =========================
-    # 公開画面の場合は公開記事のみ、それ以外は全記事を取得
-    if public:
-        posts = load_posts(public_only=True)
-    else:
-        posts = load_posts()
-
-    # カテゴリ・トピック・グループ情報を取得
-    cats = load_categories()
+    # 全記事を取得（公開画面の場合は③で公開記事のみに絞り込む）
+    posts = load_posts()
 
     # =========================
-    # ② ID → 名前 map 作成
+    # ② ID → 名前 map 取得
     # =========================
-    # 表示用に ID から名前へ変換するためのマップを作成
-    category_map = {c["id"]: c["name"] for c in cats["categories"]}
-    topic_map = {t["id"]: t["name"] for t in cats["topics"]}
-    group_map = {g["id"]: g["name"] for g in cats["groups"]}
+    # 表示用に ID から名前へ変換するためのマップを取得
+    # （カテゴリ情報が更新されるまで構築済みのものを使い回す）
+    maps = load_name_maps()
+    category_map = maps["category"]
+    topic_map = maps["topic"]
+    group_map = maps["group"]
 
     # 検索状態を示すフラグと検索クエリ
     searched = False
     search_query = None
 
-    # =========================
-    # ③ 検索（キーワード）
-    # =========================
-    # タイトルまたは本文にキーワードが含まれる記事を抽出
+    # キーワードが指定されている場合は検索状態にする
     if q is not None:
         q = q.strip()
         if q != "":
             searched = True
             search_query = q
-            q_lower = q.lower()
-
-            posts = [
-                p for p in posts
-                if q_lower in p["title"].lower()
-                or q_lower in p["content"].lower()
-            ]
-
-    # =========================
-    # ④ 絞り込み（カテゴリ / トピック / グループ）
-    # =========================
-    filtered = False
-
-    # カテゴリで絞り込み
-    if category_id is not None:
-        filtered = True
-        posts = [p for p in posts if p.get("category_id") == category_id]
 
-    # トピックで絞り込み
-    if topic_id is not None:
-        filtered = True
-        posts = [p for p in posts if p.get("topic_id") == topic_id]
-
-    # グループで絞り込み
-    if group_id is not None:
-        filtered = True
-        posts = [p for p in posts if p.get("group_id") == group_id]
+    # カテゴリ / トピック / グループのいずれかが指定されていれば絞り込み状態にする
+    filtered = any(v is not None for v in (category_id, topic_id, group_id))
 
     # =========================
-    # ⑤ ソート
+    # ③ 検索・絞り込み
     # =========================
-    # 作成日時で並び替え
-    if sort == "created_asc":
-        posts.sort(key=lambda x: x["created_at"])
+    if not searched and not filtered:
+        # 条件が無い場合（トップページ等）は検索用インデックスを使わず、
+        # 読み込み済みの一覧（公開記事のみの一覧もキャッシュ済み）をそのまま使う
+        posts = load_posts(public_only=public).items
     else:
-        posts.sort(key=lambda x: x["created_at"], reverse=True)
+        # 検索用インデックスを使って該当する記事IDを取得し、記事データに変換する
+        post_ids = search_post_ids(
+            posts,
+            q=search_query,
+            category_id=category_id,
+            topic_id=topic_id,
+            group_id=group_id,
+            public_only=public,
+        )
+        posts = [posts.by_id[i] for i in post_ids]
 
     # =========================
-    # ⑥ ページネーション
+    # ④ ページネーション
     # =========================
     total = len(posts)
     total_pages = ceil(total / limit) if total > 0 else 1
@@ -98,19 +81,37 @@ def build_post_list(
     # 表示対象の開始・終了インデックスを計算
     start = (page - 1) * limit
     end = start + limit
-    page_posts = posts[start:end]
 
     # =========================
-    # ⑦ 表示用データ付与（name）
+    # ⑤ ソート
     # =========================
-    # ID をもとにカテゴリ・トピック・グループ名を付与
-    for p in page_posts:
-        p["category_name"] = category_map.get(p.get("category_id"), "")
-        p["topic_name"] = topic_map.get(p.get("topic_id"), "")
-        p["group_name"] = group_map.get(p.get("group_id"), "")
+    # 作成日時で並び替え、表示対象のページ分だけを取り出す
+    # ※ 全件は並び替えず、先頭から表示ページの末尾までの件数だけを heapq で選ぶ
+    #   （結果は sorted で全件を並び替えた場合の該当ページと同じ）
+    if sort == "created_asc":
+        page_posts = heapq.nsmallest(end, posts, key=lambda x: x["created_at"])[start:]
+    else:
+        page_posts = heapq.nlargest(end, posts, key=lambda x: x["created_at"])[start:]
 
     # =========================
-    # ⑧ return
+    # ⑥ 表示用データ付与（name）
+    # =========================
+    # ID をもとにカテゴリ・トピック・グループ名を付与
+    # ※ キャッシュ上の元データはコピーせず、名前のみを持つ辞書と重ねたビューにする
+    page_posts = [
+        ChainMap(
+            {
+                "category_name": category_map.get(p.get("category_id"), ""),
+                "topic_name": topic_map.get(p.get("topic_id"), ""),
+                "group_name": group_map.get(p.get("group_id"), ""),
+            },
+            p,
+        )
+        for p in page_posts
+    ]
+
+    # =========================
+    # ⑦ return
     # =========================
     # 一覧表示に必要な情報をまとめて返却
     return {
@@ -121,3 +122,37 @@ def build_post_list(
         "total": total,
         "filtered": filtered,
     }
+
+
+# =====================================
+# 絞り込みセレクトボックス（HTML キャッシュ）
+# =====================================
+def render_category_filter(category_id=None, topic_id=None, group_id=None):
+    """
+    カテゴリ／トピック／グループ絞り込み用セレクトボックスの HTML を返す
+
+    カテゴリ情報のバージョンと選択状態が同じであれば、描画済みの HTML を再利用する
+    （カテゴリ情報が保存されるとバージョンが変わるため自動的に描画し直される）
+    """
+    return _render_category_filter(
+        get_categories_version(), category_id, topic_id, group_id
+    )
+
+
+@lru_cache(maxsize=64)
+def _render_category_filter(categories_version, category_id, topic_id, group_id):
+    """
+    絞り込みセレクトボックスを描画する（結果は lru_cache で保持）
+
+    :param categories_version: キャッシュキー用のカテゴリ情報バージョン
+    """
+    cats = load_categories()
+
+    return templates.env.get_template("components/filter_select_options.html").render(
+        categories=cats["categories"],
+        topics=cats["topics"],
+        groups=cats["groups"],
+        category_id=category_id,
+        topic_id=topic_id,
+        group_id=group_id,
+    )
@@ -1,4 +1,5 @@
-from util.dataLoader import load_posts, save_posts
+import heapq
+from util.dataLoader import load_posts, replace_post, posts_lock, post_ids_by
 from util.post_status import (
     STATUS_PUBLIC,
     STATUS_PRIVATE,
@@ -21,13 +22,13 @@ def toggle_status(post_id: int, status: str) -> bool:
     if status not in ("public", "private"):
         return False
 
-    # 全記事データを読み込む
-    posts = load_posts()
+    with posts_lock:
+        # 全記事データを読み込み、対象の記事を ID で取得する
+        post = load_posts().get(post_id)
 
-    for post in posts:
-        # 対象の記事IDでなければスキップ
-        if post.get("id") != post_id:
-            continue
+        # 対象の記事が見つからなかった場合
+        if post is None:
+            return False
 
         # 下書き状態の記事は公開・非公開の切り替え不可
         if post.get("status") == STATUS_DRAFT:
@@ -39,46 +40,45 @@ def toggle_status(post_id: int, status: str) -> bool:
         if status == "private" and post["status"] == STATUS_PRIVATE:
             return True
 
-        # ステータスを更新
-        post["status"] = (
-            STATUS_PUBLIC if status == "public"
-            else STATUS_PRIVATE
-        )
+        # ステータスを更新（キャッシュ上の元データは書き換えずコピーを作る）
+        post = {
+            **post,
+            "status": STATUS_PUBLIC if status == "public" else STATUS_PRIVATE,
+        }
 
-        # 更新後の記事データを保存
-        save_posts(posts)
+        # 更新後の記事データを保存（対象の1件のみ）
+        replace_post(post)
         return True
 
-    # 対象の記事が見つからなかった場合
-    return False
-
 
 # =====================================
 # 関連記事取得（公開記事のみ）
 # =====================================
-def get_related_posts(post, limit: int = 3):
+def get_related_posts(post, limit: int = 3, posts=None):
     """
     同一カテゴリに属する公開記事から関連記事を取得する
 
     - 自分自身の記事は除外
     - 作成日時の新しい順に並べ替える
+
+    :param posts: 読み込み済みの投稿データ（省略時は load_posts() で取得する）
     """
 
-    # 公開記事のみを取得
-    posts = load_posts(public_only=True)
+    # 全記事を取得（公開状態の判定は抽出時に行う）
+    if posts is None:
+        posts = load_posts()
 
-    # 同一カテゴリかつ自分以外の記事を抽出
+    # 同一カテゴリの公開記事をインデックスから取得し、自分以外を抽出
     related = [
-        p for p in posts
-        if p.get("id") != post.get("id")
-        and p.get("category_id") == post.get("category_id")
+        posts.by_id[i]
+        for i in post_ids_by(posts, "category_id", post.get("category_id"), public_only=True)
+        if i != post.get("id")
     ]
 
-    # 作成日時の新しい順にソート
-    related.sort(
+    # 作成日時の新しい順に、指定件数分だけ返却
+    # （全件は並び替えず、heapq で上位のみを選ぶ）
+    return heapq.nlargest(
+        limit,
+        related,
         key=lambda x: x.get("created_at", ""),
-        reverse=True
     )
-
-    # 指定件数分だけ返却
-    return related[:limit]
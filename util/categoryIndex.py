@@ -0,0 +1,107 @@
+# categories.json で管理するエンティティの種類
+ENTITY_KINDS = ("categories", "topics", "groups")
+
+
+def name_key(name):
+    """
+    名前の重複判定に使用するキー（大文字小文字を区別しない）を返す
+
+    lower() ではなく casefold() を使い、ß → ss のような
+    Unicode の大文字小文字の揺れも同一視する。
+    エンティティには name_lower として保存しておき、判定のたびに変換しない
+    """
+    return name.casefold()
+
+
+class EntityIndex:
+    """
+    カテゴリ／トピック／グループのいずれか1種類分の検索用インデックス
+
+    - by_id: ID → エンティティ（辞書）
+    - by_name: 小文字化した名前（name_lower） → ID
+    - positions: ID → 構築元リスト上の位置（構築後に add した分は含まない）
+
+    線形探索をせずに、重複チェックを O(1) で行うために使用する
+    """
+
+    # 属性を固定し、インスタンスごとの __dict__ を持たないようにする
+    __slots__ = ("by_id", "by_name", "positions")
+
+    def __init__(self, items):
+        self.by_id = {}
+        self.by_name = {}
+        self.positions = {}
+
+        for i, item in enumerate(items):
+            self.positions[item["id"]] = i
+            self.add(item)
+
+    def add(self, item):
+        """
+        エンティティをインデックスに登録する
+
+        :param item: id / name / name_lower を持つエンティティ（辞書）
+        """
+        self.by_id[item["id"]] = item
+        self.by_name[item["name_lower"]] = item["id"]
+
+    def rename(self, item, name):
+        """
+        登録済みのエンティティの名前を変更し、名前のインデックスも更新する
+
+        :param item: by_id に登録済みのエンティティ（辞書。直接書き換える）
+        :param name: 新しい名前
+        """
+        self.discard_name(item)
+        item["name"] = name
+        item["name_lower"] = name_key(name)
+        self.by_name[item["name_lower"]] = item["id"]
+
+    def discard_name(self, item):
+        """
+        エンティティの名前を名前のインデックスから取り除く（削除時に使用する）
+
+        by_id には残すため、ID による存在確認は引き続き行える
+        """
+        if self.by_name.get(item["name_lower"]) == item["id"]:
+            del self.by_name[item["name_lower"]]
+
+    def has_name(self, name, exclude_id=None):
+        """
+        同名（大文字小文字を区別しない）のエンティティが存在するか判定する
+
+        :param exclude_id: 判定から除外するID（名前変更時の自分自身）
+        """
+        found = self.by_name.get(name_key(name))
+        return found is not None and found != exclude_id
+
+
+def issue_id(cats, kind):
+    """
+    新規作成するエンティティのIDを採番する
+
+    categories.json に保存している採番カウンタ（seq）を1つ進めて返すため、
+    既存IDの最大値を求める走査は行わない。削除されたIDは再利用しない
+
+    :param cats: load_categories(for_update=True) で読み込んだカテゴリデータ
+    :param kind: "categories" / "topics" / "groups"
+    :return: 新しいID
+    """
+    new_id = cats["seq"][kind] + 1
+    cats["seq"][kind] = new_id
+    return new_id
+
+
+class CategoryIndex:
+    """
+    categories.json の内容（categories / topics / groups）から構築するインデックス
+
+    load_categories() の戻り値を渡して生成する
+    """
+
+    __slots__ = ("categories", "topics", "groups")
+
+    def __init__(self, cats):
+        self.categories = EntityIndex(cats["categories"])
+        self.topics = EntityIndex(cats["topics"])
+        self.groups = EntityIndex(cats["groups"])
@@ -1,8 +1,43 @@
 import os
-import json
+import copy
+import threading
+from collections import ChainMap, defaultdict
+import hashlib
 import markdown
 from fastapi import HTTPException
 from util.post_status import STATUS_PUBLIC
+from util.categoryIndex import CategoryIndex, ENTITY_KINDS, name_key
+from util.postsCollection import PostsCollection
+from util.jsonFile import read_json, write_json
+from util import postsStore
+
+# 投稿データ・カテゴリ情報の読み書きはこのモジュールの関数に一本化する
+# （ファイルを直接読み書きすると、キャッシュや書き込み時のロックが効かなくなる）
+__all__ = [
+    "posts_lock",
+    "categories_lock",
+    "is_cache_fresh",
+    "warm_cache",
+    "is_post_html_fresh",
+    "warm_post_html",
+    "load_posts",
+    "save_posts",
+    "add_post",
+    "replace_post",
+    "remove_post",
+    "search_post_ids",
+    "post_ids_by",
+    "load_categories",
+    "save_categories",
+    "get_categories_version",
+    "load_category_index",
+    "load_name_maps",
+    "rename_category_entity",
+    "get_post_detail_public",
+    "get_post_detail_admin",
+    "load_topics_by_category",
+    "load_groups_by_topic",
+]
 
 # プロジェクトのルートディレクトリ
 # util ディレクトリの1階層上を基準にする
@@ -11,108 +46,588 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 # data フォルダのパス
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
-# 投稿データ（記事一覧）JSON のパス
-POSTS_PATH = os.path.join(DATA_DIR, "posts.json")
-
 # カテゴリ／トピック／グループ管理用 JSON のパス
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
 
+# -----------------------------
+# 読み込みキャッシュ
+# -----------------------------
+# ファイルの状態（更新時刻など）をキーに、パース済みデータをメモリ上に保持する
+# ファイルが更新されていなければ再読み込み・再パースを行わない
+_posts_cache = {"key": None, "data": None, "log_count": 0}
+_categories_cache = {"mtime": None, "data": None}
+
+# -----------------------------
+# 書き込み時の排他制御
+# -----------------------------
+# 同時に届いた管理者リクエストが互いの変更を上書きしないよう、
+# 「読み込み → 変更 → 保存」の一連の処理をロックで直列化する
+# （保存処理の内部でも取得するため、呼び出し側で取得済みでも使える RLock を使用する）
+#
+# 両方を取得する場合は必ず categories_lock → posts_lock の順で取得する
+# ※ 複数プロセスで起動する場合はプロセス間のロックが別途必要
+posts_lock = threading.RLock()
+categories_lock = threading.RLock()
+
+# カテゴリ検索用インデックスのキャッシュ
+# 構築元のデータ（キャッシュ共有の辞書）が変わった場合のみ再構築する
+_category_index_cache = {"data": None, "index": None}
+
+# 記事本文の HTML 変換結果のキャッシュ
+# 記事ID → (本文の SHA-1 ダイジェスト, HTML)
+# 記事1件につき最新の1件のみを保持し、本文そのものはキーに持たない
+_html_cache = {}
+
+# Markdown → HTML 変換器（拡張機能の登録は起動時の1回のみ行い、以降は使い回す）
+# 変換器は内部状態を持つため、変換は _markdown_lock を取得して1件ずつ行う
+_markdown = markdown.Markdown(extensions=["fenced_code", "tables", "toc", "nl2br"])
+_markdown_lock = threading.Lock()
+
+# キーワード検索用の小文字化済みテキストのキャッシュ
+# 投稿ID → (タイトル, 本文, 小文字化したタイトルと本文)
+# 検索用インデックスを作り直す際、タイトル・本文が変わっていない投稿は小文字化をやり直さない
+_search_text_cache = {"texts": {}}
+
+# ID → 名前 変換用マップのキャッシュ（カテゴリ検索用インデックスと同じ条件で再構築する）
+_name_maps_cache = {"data": None, "maps": None}
+
+
+def _get_mtime(path):
+    """
+    ファイルの更新時刻を取得する
+
+    秒単位の浮動小数ではなくナノ秒単位の整数を使い、
+    短時間に続けて保存された場合も変更を見逃さないようにする
+
+    :return: 更新時刻（ナノ秒。ファイルが存在しない場合は None）
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def is_cache_fresh():
+    """
+    投稿データ・カテゴリ情報のキャッシュがどちらも最新か判定する
+
+    ファイルの状態を確認するだけで読み込みは行わない。
+    非同期のルートで、読み込み（ブロッキング処理）が必要な場合のみ
+    スレッドプールに処理を回す判定に使用する
+    """
+    posts_key = postsStore.state_key()
+    if posts_key is None or _posts_cache["key"] != posts_key:
+        return False
+
+    categories_mtime = _get_mtime(CATEGORIES_PATH)
+    return categories_mtime is None or _categories_cache["mtime"] == categories_mtime
+
+
+def warm_cache():
+    """
+    投稿データ・カテゴリ情報を読み込み、キャッシュを最新の状態にする
+    """
+    load_posts()
+    load_categories()
+
+
 # -----------------------------
 # Posts 読み書き
 # -----------------------------
 def load_posts(*, public_only=False):
     """
-    投稿データを JSON ファイルから読み込む
+    投稿データを読み込む（保存形式は util/postsStore.py を参照）
+
+    ファイルが前回読み込み時から更新されていない場合はキャッシュを返す。
+    キャッシュは共有されるため、内容は書き換えず add_post / replace_post / remove_post で更新する
 
     :param public_only: True の場合は公開状態の記事のみを返す
-    :return: 投稿データのリスト
+    :return: PostsCollection（投稿一覧 + ID → 投稿 の辞書）
     """
-    try:
-        # posts.json を読み込む
-        with open(POSTS_PATH, "r", encoding="utf-8") as f:
-            posts = json.load(f)
+    key = postsStore.state_key()
+    posts = _posts_cache["data"]
+
+    # キャッシュが無い、またはファイルが更新されている場合のみ読み込む
+    if key is None or _posts_cache["key"] != key:
+        try:
+            items, log_count = postsStore.read_posts()
+        except Exception:
+            # ファイルが存在しない・JSON が壊れている等の場合は空の一覧を返す
+            return PostsCollection([])
+
+        posts = PostsCollection(items)
+
+        _posts_cache["key"] = key
+        _posts_cache["data"] = posts
+        _posts_cache["log_count"] = log_count
+
+    # 公開記事のみ取得する場合はステータスでフィルタリング
+    # キャッシュ共有の一覧から作った結果は、投稿が変更されるまで使い回す
+    if public_only:
+        if posts.public_view is None:
+            posts.public_view = _public_projection(posts)
+        posts = posts.public_view
 
-        # 公開記事のみ取得する場合はステータスでフィルタリング
-        if public_only:
-            posts = [
-                p for p in posts
-                if p.get("status") == STATUS_PUBLIC
-            ]
+    return posts
 
-        return posts
 
-    except Exception:
-        # ファイルが存在しない・JSON が壊れている等の場合は空リストを返す
-        return []
+def _public_projection(posts):
+    """
+    公開状態の記事のみを集めた PostsCollection を作成する
+    """
+    return PostsCollection(
+        p for p in posts
+        if p.get("status") == STATUS_PUBLIC
+    )
 
 
 def save_posts(posts):
     """
-    投稿データを JSON ファイルに保存する
+    投稿データを全件保存する
+
+    スナップショットを作り直して変更ログを空にする。
+    保存後は書き込んだ内容をそのままキャッシュとして保持する
+
+    :param posts: 投稿データのリスト、または PostsCollection
+    """
+    if not isinstance(posts, PostsCollection):
+        posts = PostsCollection(posts)
+
+    with posts_lock:
+        postsStore.compact(posts.items)
+
+        # 保存内容でキャッシュを更新
+        _posts_cache["key"] = postsStore.state_key()
+        _posts_cache["data"] = posts
+        _posts_cache["log_count"] = 0
+
+
+def add_post(post):
+    """
+    投稿を1件追加する（変更ログへの追記のみで全件の書き直しは行わない）
+
+    :param post: 追加する投稿データ
+    """
+    _put_post(post)
+
+
+def replace_post(post):
+    """
+    既存の投稿を1件置き換える（変更ログへの追記のみで全件の書き直しは行わない）
+
+    :param post: 更新後の投稿データ（id で対象を特定する）
+    """
+    _put_post(post)
+
+
+def remove_post(post_id):
+    """
+    投稿を1件削除する（変更ログへの追記のみで全件の書き直しは行わない）
+
+    :param post_id: 削除する投稿ID
+    """
+    with posts_lock:
+        fresh = _posts_cache["key"] == postsStore.state_key()
+
+        # 存在しない投稿の削除はログに記録しない（ログの肥大化・不要なコンパクションを防ぐ）
+        if fresh and post_id not in _posts_cache["data"].by_id:
+            return
+
+        postsStore.append_delete(post_id)
+
+        # キャッシュが最新だった場合は同じ変更を反映した一覧に差し替える
+        # ※ 参照中のスレッドがあるため、キャッシュ済みの一覧そのものは変更しない
+        posts = None
+        if fresh:
+            posts = _posts_cache["data"].without_post(post_id)
+        _after_log_append(posts)
+
+        # 削除した記事の HTML 変換結果は不要になるため破棄する
+        _html_cache.pop(post_id, None)
+
+
+def _put_post(post):
+    """
+    投稿の追加・更新を変更ログに追記し、キャッシュにも反映する
+    """
+    with posts_lock:
+        fresh = _posts_cache["key"] == postsStore.state_key()
+        postsStore.append_put(post)
+
+        # キャッシュが最新だった場合は同じ変更を反映した一覧に差し替える
+        # ※ 参照中のスレッドがあるため、キャッシュ済みの一覧そのものは変更しない
+        posts = None
+        if fresh:
+            posts = _posts_cache["data"].with_post(post)
+        _after_log_append(posts)
+
+
+def _after_log_append(posts):
+    """
+    変更ログ追記後のキャッシュ更新とコンパクションを行う
+
+    :param posts: 変更を反映済みの投稿一覧（キャッシュが古かった場合は None）
+    """
+    if posts is None:
+        # 次回の load_posts で読み直させる
+        _posts_cache["key"] = None
+        return
+
+    _posts_cache["key"] = postsStore.state_key()
+    _posts_cache["data"] = posts
+    _posts_cache["log_count"] += 1
+
+    # ログがたまったらスナップショットを作り直す
+    if postsStore.needs_compaction(_posts_cache["log_count"], len(posts)):
+        save_posts(posts)
+
+
+# -----------------------------
+# 投稿の検索・絞り込み
+# -----------------------------
+def _build_search_index(posts):
+    """
+    投稿の検索・絞り込み用インデックスを構築する
+
+    - by_category / by_topic / by_group: 各ID → 該当する投稿IDのリスト（元の並び順）
+    - searchable: 投稿ID → 小文字化したタイトルと本文（キーワード検索用）
+    - public / public_ids: 公開状態の投稿IDのリスト（元の並び順）と、判定用の set
+
+    小文字化したテキストは前回の構築結果を引き継ぎ、
+    タイトル・本文が変更された投稿のみ作り直す
+    """
+    by_category = defaultdict(list)
+    by_topic = defaultdict(list)
+    by_group = defaultdict(list)
+    searchable = {}
+    public = []
+
+    previous = _search_text_cache["texts"]
+    texts = {}
+
+    for p in posts:
+        post_id = p["id"]
+        by_category[p.get("category_id")].append(post_id)
+        by_topic[p.get("topic_id")].append(post_id)
+        by_group[p.get("group_id")].append(post_id)
+        if p.get("status") == STATUS_PUBLIC:
+            public.append(post_id)
+
+        title = p["title"]
+        content = p["content"]
+        entry = previous.get(post_id)
+        if entry is None or entry[0] != title or entry[1] != content:
+            entry = (title, content, (title + "\n" + content).lower())
+        texts[post_id] = entry
+        searchable[post_id] = entry[2]
+
+    # 削除された投稿の分は引き継がない
+    _search_text_cache["texts"] = texts
+
+    return {
+        "by_category": by_category,
+        "by_topic": by_topic,
+        "by_group": by_group,
+        "searchable": searchable,
+        "public": public,
+        "public_ids": set(public),
+    }
+
+
+def _get_search_index(posts):
+    """
+    投稿一覧の検索用インデックスを取得する（未構築の場合は構築する）
+
+    インデックスは PostsCollection に保持され、投稿が変更されるまで使い回す
+    """
+    index = posts.search_index
+    if index is None:
+        index = posts.search_index = _build_search_index(posts)
+    return index
 
-    :param posts: 投稿データのリスト
+
+# post_ids_by で指定できる項目と、対応するインデックスのキー
+_POST_INDEX_KEYS = {
+    "category_id": "by_category",
+    "topic_id": "by_topic",
+    "group_id": "by_group",
+}
+
+
+def post_ids_by(posts, key, value, public_only=False):
+    """
+    カテゴリ／トピック／グループのいずれかが一致する投稿IDを返す
+
+    全件を走査せず、検索用インデックスから該当分のみを取得する。
+    戻り値はインデックスそのもののため、書き換えないこと
+
+    :param posts: load_posts() で取得した PostsCollection
+    :param key: "category_id" / "topic_id" / "group_id"
+    :param value: 一致させるID
+    :param public_only: True の場合は公開状態の投稿のみを返す（この場合は新しいリストになる）
+    :return: 該当する投稿IDのリスト（元の並び順。該当なしの場合は空）
+    """
+    index = _get_search_index(posts)
+    ids = index[_POST_INDEX_KEYS[key]].get(value, [])
+
+    if public_only:
+        public_ids = index["public_ids"]
+        ids = [i for i in ids if i in public_ids]
+
+    return ids
+
+
+def search_post_ids(
+    posts,
+    q=None,
+    category_id=None,
+    topic_id=None,
+    group_id=None,
+    public_only=False,
+):
+    """
+    キーワード・カテゴリ／トピック／グループで投稿を絞り込み、該当する投稿IDを返す
+
+    - 指定された絞り込み条件のうち、該当件数が最も少ないものを起点に残りの条件を確認する
+    - 全件を走査するのは絞り込み条件が1つも無い場合のみ
+      （公開記事のみの場合は、インデックス構築時に振り分け済みの公開記事のみを走査する）
+    - インデックスは投稿データが変更されるまで使い回す
+
+    :param posts: load_posts() で取得した PostsCollection
+    :param q: 検索キーワード（前後の空白は除去済みであること）
+    :param public_only: True の場合は公開状態の記事のみを返す
+    :return: 該当する投稿IDのリスト（元の並び順）
     """
-    with open(POSTS_PATH, "w", encoding="utf-8") as f:
-        # 日本語をそのまま保持し、整形して保存
-        json.dump(posts, f, ensure_ascii=False, indent=2)
+    index = _get_search_index(posts)
+
+    # 指定された条件ごとの候補（投稿IDのリスト）
+    conditions = []
+    if category_id is not None:
+        conditions.append(("category_id", category_id, index["by_category"].get(category_id, [])))
+    if topic_id is not None:
+        conditions.append(("topic_id", topic_id, index["by_topic"].get(topic_id, [])))
+    if group_id is not None:
+        conditions.append(("group_id", group_id, index["by_group"].get(group_id, [])))
+
+    if conditions:
+        # 最も候補の少ない条件を起点にし、残りの条件は投稿の値で判定する
+        conditions.sort(key=lambda c: len(c[2]))
+        ids = conditions[0][2]
+        for key, value, _ in conditions[1:]:
+            ids = [i for i in ids if posts.by_id[i].get(key) == value]
+    elif public_only:
+        # 公開記事のみの一覧はインデックスに用意済みのため、ここで絞り込みは完了する
+        ids = index["public"]
+        public_only = False
+    else:
+        ids = [p["id"] for p in posts]
+
+    # キーワード検索（タイトルまたは本文に含まれるもの）
+    if q:
+        q_lower = q.lower()
+        searchable = index["searchable"]
+        ids = [i for i in ids if q_lower in searchable[i]]
+
+    # 公開記事のみに絞り込む（投稿データは参照せず、公開記事IDの set で判定する）
+    if public_only:
+        public_ids = index["public_ids"]
+        ids = [i for i in ids if i in public_ids]
+
+    return ids
 
 
 # -----------------------------
 # Categories 読み書き
 # -----------------------------
-def load_categories():
+def load_categories(*, for_update=False):
     """
     カテゴリ／トピック／グループ情報を JSON ファイルから読み込む
 
-    :return: categories / topics / groups を含む辞書
+    ファイルが前回読み込み時から更新されていない場合はキャッシュを返す。
+    キャッシュは共有されるため、内容を書き換える場合は for_update=True を指定する
+
+    :param for_update: True の場合はキャッシュを汚さないようコピーを返す
+    :return: categories / topics / groups と採番カウンタ（seq）を含む辞書
     """
-    try:
-        # categories.json を読み込む
-        with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return {
-                "categories": data.get("categories", []),
-                "topics": data.get("topics", []),
-                "groups": data.get("groups", [])
-            }
-    except FileNotFoundError:
+    mtime = _get_mtime(CATEGORIES_PATH)
+    if mtime is None:
         # ファイルが存在しない場合は空データを返す
-        return {"categories": [], "topics": [], "groups": []}
+        return _empty_categories()
+
+    data = _categories_cache["data"]
+
+    # キャッシュが無い、またはファイルが更新されている場合のみ読み込む
+    if _categories_cache["mtime"] != mtime:
+        try:
+            # categories.json を読み込む
+            raw = read_json(CATEGORIES_PATH)
+        except FileNotFoundError:
+            # ファイルが存在しない場合は空データを返す
+            return _empty_categories()
+
+        data = {
+            "categories": raw.get("categories", []),
+            "topics": raw.get("topics", []),
+            "groups": raw.get("groups", [])
+        }
+
+        # 採番カウンタ（各種類で最後に採番したID）
+        # 未保存の旧形式や、手作業で追加されたIDがある場合は既存IDの最大値に合わせる
+        seq = raw.get("seq", {})
+        data["seq"] = {
+            key: max(seq.get(key, 0), max((item["id"] for item in data[key]), default=0))
+            for key in ENTITY_KINDS
+        }
+
+        # 重複判定用の name_lower はメモリ上で計算し直す
+        # （未保存の旧形式や、lower() で保存された値が残っている場合に備える。
+        #   ファイル更新時の読み込みでのみ行うため、判定のたびの変換は発生しない）
+        for key in ENTITY_KINDS:
+            for item in data[key]:
+                item["name_lower"] = name_key(item["name"])
+
+        _categories_cache["mtime"] = mtime
+        _categories_cache["data"] = data
+
+    # 更新用の場合はキャッシュと切り離したコピーを返す
+    if for_update:
+        return copy.deepcopy(data)
+
+    return data
+
+
+def _empty_categories():
+    """
+    categories.json が存在しない場合に使用する空のカテゴリデータを返す
+    """
+    data = {key: [] for key in ENTITY_KINDS}
+    data["seq"] = {key: 0 for key in ENTITY_KINDS}
+    return data
 
 
 def save_categories(data):
     """
     カテゴリ／トピック／グループ情報を JSON ファイルに保存する
 
+    保存後は書き込んだ内容をそのままキャッシュとして保持する
+
     :param data: categories / topics / groups を含む辞書
     """
-    with open(CATEGORIES_PATH, "w", encoding="utf-8") as f:
-        # 日本語を保持し、整形して保存
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with categories_lock:
+        write_json(CATEGORIES_PATH, data)
+
+        # 保存内容でキャッシュを更新
+        _categories_cache["data"] = data
+        _categories_cache["mtime"] = _get_mtime(CATEGORIES_PATH)
+
+def get_categories_version():
+    """
+    現在のカテゴリ情報のバージョン（categories.json の更新時刻）を返す
+
+    カテゴリ情報から生成した表示用データのキャッシュキーとして使用する。
+    save_categories で保存されるたびに値が変わる
+
+    :return: 更新時刻（ファイルが存在しない場合は None）
+    """
+    load_categories()
+    return _categories_cache["mtime"]
+
+
+def load_category_index():
+    """
+    カテゴリ／トピック／グループの検索用インデックスを取得する
+
+    categories.json が更新されていなければ構築済みのインデックスを返す。
+    参照専用のため、書き換える場合は更新用データから CategoryIndex を生成すること
+
+    :return: CategoryIndex
+    """
+    cats = load_categories()
+
+    # 構築元のデータが変わった場合のみ再構築する
+    if _category_index_cache["data"] is not cats:
+        _category_index_cache["index"] = CategoryIndex(cats)
+        _category_index_cache["data"] = cats
+
+    return _category_index_cache["index"]
+
+
+def load_name_maps():
+    """
+    表示用の ID → 名前 変換マップを取得する
+
+    categories.json が更新されていなければ構築済みのマップを返す。
+    参照専用のため、内容を書き換えないこと
+
+    :return: {"category": {id: name}, "topic": {id: name}, "group": {id: name}}
+    """
+    cats = load_categories()
+
+    # 構築元のデータが変わった場合のみ再構築する
+    if _name_maps_cache["data"] is not cats:
+        _name_maps_cache["maps"] = {
+            "category": {c["id"]: c["name"] for c in cats["categories"]},
+            "topic": {t["id"]: t["name"] for t in cats["topics"]},
+            "group": {g["id"]: g["name"] for g in cats["groups"]},
+        }
+        _name_maps_cache["data"] = cats
+
+    return _name_maps_cache["maps"]
+
+
+def rename_category_entity(kind, entity_id, name):
+    """
+    カテゴリ／トピック／グループのいずれか1件の名前を変更して保存する
+
+    - 対象はインデックスから ID で直接取得し、一覧の走査は行わない
+    - キャッシュ上のデータは書き換えず、対象の1件と、それを含むリストのみ作り直す
+
+    :param kind: "categories" / "topics" / "groups"
+    :param entity_id: 対象のID
+    :param name: 新しい名前
+    :return: 対象が存在し更新した場合は True
+    """
+    with categories_lock:
+        cats = load_categories()
+        positions = getattr(load_category_index(), kind).positions
+
+        i = positions.get(entity_id)
+        if i is None:
+            return False
+
+        # 対象の1件だけ新しい辞書に置き換える
+        items = list(cats[kind])
+        items[i] = {**items[i], "name": name, "name_lower": name_key(name)}
+
+        save_categories({**cats, kind: items})
+        return True
+
 
 # -----------------------------
 # 投稿記事詳細（public 用）
 # -----------------------------
-def get_post_detail_public(post_id):
+def get_post_detail_public(post_id, posts=None):
     """
     一般ユーザー向けの記事詳細を取得する
 
     - 指定された post_id の記事を取得
     - 公開状態（STATUS_PUBLIC）の記事のみを対象とする
     - 表示用に加工した記事データを返す
+
+    :param posts: 読み込み済みの投稿データ（省略時は load_posts() で取得する）
     """
-    # 投稿データとカテゴリ関連データを読み込む
-    posts = load_posts()
-    cats = load_categories()
+    # 投稿データを読み込む
+    if posts is None:
+        posts = load_posts()
 
     # 対象の記事を検索
-    post = next((p for p in posts if p["id"] == post_id), None)
+    post = posts.get(post_id)
     if not post or post.get("status") != STATUS_PUBLIC:
         # 記事が存在しない、または非公開の場合は 404
         raise HTTPException(status_code=404)
 
     # 表示用に加工して返却
-    return _decorate_post(post, cats)
+    return _decorate_post(post)
 
 
 # -----------------------------
@@ -124,50 +639,101 @@ def get_post_detail_admin(post_id):
 
     公開・非公開・下書きを問わず記事を取得する
     """
-    # 投稿データとカテゴリ関連データを読み込む
+    # 投稿データを読み込む
     posts = load_posts()
-    cats = load_categories()
 
     # 対象の記事を検索
-    post = next((p for p in posts if p["id"] == post_id), None)
+    post = posts.get(post_id)
     if not post:
         # 記事が存在しない場合は None を返す
         return None
 
     # 表示用に加工して返却
-    return _decorate_post(post, cats)
+    return _decorate_post(post)
 
 
 # -----------------------------
 # 表示用共通加工
 # -----------------------------
-def _decorate_post(post, cats):
+def _decorate_post(post):
     """
     記事データを表示用に加工する共通処理
 
     - カテゴリ／トピック／グループ名を付与
     - Markdown を HTML に変換
     """
-    # ID → 名前変換用のマップを作成
-    category_map = {c["id"]: c["name"] for c in cats["categories"]}
-    topic_map = {t["id"]: t["name"] for t in cats["topics"]}
-    group_map = {g["id"]: g["name"] for g in cats["groups"]}
+    # ID → 名前変換用のマップを取得（カテゴリ情報が更新されるまで使い回す）
+    maps = load_name_maps()
 
-    # 元データを破壊しないためコピーを作成
-    post = post.copy()  # ★ 破壊防止（重要）
+    # 表示用の項目のみを別の辞書にまとめる
+    display = {
+        # カテゴリ／トピック／グループ名を付与
+        "category_name": maps["category"].get(post["category_id"], "未分類"),
+        "topic_name": maps["topic"].get(post["topic_id"], "-"),
+        "group_name": maps["group"].get(post["group_id"], "-"),
 
-    # カテゴリ／トピック／グループ名を付与
-    post["category_name"] = category_map.get(post["category_id"], "未分類")
-    post["topic_name"] = topic_map.get(post["topic_id"], "-")
-    post["group_name"] = group_map.get(post["group_id"], "-")
+        # Markdown を HTML に変換（変換結果はキャッシュを利用する）
+        "html_content": _render_html_cached(post["id"], post["content"]),
+    }
 
-    # Markdown を HTML に変換
-    post["html_content"] = markdown.markdown(
-        post["content"],
-        extensions=["fenced_code", "tables", "toc", "nl2br"]
-    )
+    # 表示用の項目 → 元データ の順に参照するビューを返す
+    # ※ 元データはコピーせず、書き込みは display 側にのみ反映される（キャッシュを汚さない）
+    return ChainMap(display, post)
+
+
+def _content_digest(content):
+    """
+    HTML 変換結果のキャッシュ判定に使用する本文のダイジェスト（SHA-1）を返す
+    """
+    return hashlib.sha1(content.encode("utf-8")).digest()
+
+
+def is_post_html_fresh(post_id):
+    """
+    記事本文の HTML 変換結果がキャッシュ済みで、現在の本文と一致するか判定する
+
+    Markdown の変換は行わない。非同期のルートで、変換（CPU 負荷の高い処理）が必要な場合のみ
+    スレッドプールに処理を回す判定に使用する（記事が存在しない場合も True を返す）
+    """
+    post = load_posts().get(post_id)
+    if post is None:
+        return True
+
+    entry = _html_cache.get(post_id)
+    return entry is not None and entry[0] == _content_digest(post["content"])
+
+
+def warm_post_html(post_id):
+    """
+    記事本文を HTML に変換し、変換結果をキャッシュしておく
+    """
+    post = load_posts().get(post_id)
+    if post is not None:
+        _render_html_cached(post_id, post["content"])
+
+
+def _render_html_cached(post_id, content):
+    """
+    Markdown を HTML に変換する（結果をキャッシュする）
+
+    同じ記事は本文が変わるまで毎回同じ HTML になるため、
+    本文のダイジェストが前回と一致する場合は変換結果を使い回す。
+    本文が編集されるとダイジェストが変わり、変換し直した結果で置き換わる
+
+    :param post_id: 記事ID
+    :param content: Markdown 形式の本文
+    :return: HTML 文字列
+    """
+    digest = _content_digest(content)
+
+    entry = _html_cache.get(post_id)
+    if entry is not None and entry[0] == digest:
+        return entry[1]
 
-    return post
+    with _markdown_lock:
+        html = _markdown.reset().convert(content)
+    _html_cache[post_id] = (digest, html)
+    return html
 
 
 # --------------------------------------
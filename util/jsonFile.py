@@ -0,0 +1,138 @@
+import os
+import json
+from contextlib import contextmanager
+
+# orjson（C 実装の高速な JSON ライブラリ）がインストールされていれば使用する
+# 未インストールの場合は標準の json モジュールで同じ処理を行う
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def read_json(path):
+    """
+    JSON ファイルを読み込んでパースする
+
+    :param path: 読み込むファイルのパス
+    :return: パース結果
+    """
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+def write_json(path, data):
+    """
+    データを JSON としてファイルに書き込む
+
+    - バイト列全体をメモリ上で組み立ててから1回で書き込む
+    - 一時ファイルに書き込んだ後 os.replace で置き換えるため、
+      書き込み途中で失敗しても元のファイルが壊れない
+    - 置き換え前に一時ファイルの内容をディスクへ書き出し（fsync）、
+      OS がクラッシュした場合も中身が空のファイルに置き換わらないようにする
+    - 通常は空白なしで保存し、環境変数 JSON_PRETTY=1 の場合のみ整形して保存する
+
+    :param path: 書き込み先のパス
+    :param data: 保存するデータ
+    """
+    buf = _dumps(data, pretty=os.getenv("JSON_PRETTY") == "1")
+
+    with _atomic_open(path) as f:
+        f.write(buf)
+
+
+def write_json_array(path, items):
+    """
+    リストを JSON 配列としてファイルに書き込む（要素ごとに変換して書き込む）
+
+    write_json と異なり全体のバイト列をメモリ上に組み立てないため、
+    件数が多い場合も保存時のメモリ使用量が要素1件分の増加で済む。
+    一時ファイル経由の置き換え・fsync は write_json と同じ
+
+    ※ JSON_PRETTY=1 の場合は整形結果を揃えるため write_json で保存する
+
+    :param path: 書き込み先のパス
+    :param items: 保存するリスト
+    """
+    if os.getenv("JSON_PRETTY") == "1":
+        write_json(path, items)
+        return
+
+    with _atomic_open(path) as f:
+        f.write(b"[")
+        for i, item in enumerate(items):
+            if i:
+                f.write(b",")
+            f.write(_dumps(item))
+        f.write(b"]")
+
+
+@contextmanager
+def _atomic_open(path):
+    """
+    一時ファイルに書き込み、完了後に os.replace で置き換える
+
+    - 書き込み途中で失敗した場合は一時ファイルを削除し、元のファイルはそのまま残す
+    - 置き換え前に一時ファイルの内容をディスクへ書き出す（fsync）
+
+    :param path: 書き込み先のパス
+    """
+    tmp_path = path + ".tmp"
+
+    try:
+        # 要素ごとの小さな書き込みをまとめるため、バッファを大きめに取る
+        with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # 書き込み完了後にまとめて置き換える
+    os.replace(tmp_path, path)
+
+
+def dumps_line(data):
+    """
+    データを1行分の JSON（改行付きのバイト列）に変換する
+
+    JSON Lines 形式の追記ログに使用する
+    """
+    return _dumps(data) + b"\n"
+
+
+def loads_line(line):
+    """
+    JSON Lines 形式の1行（バイト列）をパースする
+    """
+    return _loads(line)
+
+
+def _dumps(data, pretty=False):
+    """
+    データを UTF-8 の JSON バイト列に変換する（日本語はそのまま保持する）
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    if pretty:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def _loads(buf):
+    """
+    JSON バイト列をパースする
+    """
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
@@ -0,0 +1,74 @@
+class PostsCollection:
+    """
+    投稿データの一覧と、ID → 投稿 の辞書をまとめて保持するクラス
+
+    load_posts() の戻り値として使用する。
+    一覧としての反復・件数取得・添字アクセスに加え、ID による O(1) の検索に対応する
+
+    load_posts() が返したインスタンスは複数のスレッドから参照されるため、作成後は変更しない。
+    投稿の追加・更新・削除は with_post / without_post で新しいインスタンスを作って差し替える
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+
+        # 検索・絞り込み用インデックス（util/dataLoader.py で必要になった時点で構築する）
+        # 内容は変更しないため、一度構築したものは破棄しない
+        self.search_index = None
+
+        # 公開記事のみの一覧（load_posts(public_only=True) で必要になった時点で作成する）
+        self.public_view = None
+
+        # ID → 投稿 / ID → リスト上の位置（1回の走査で構築）
+        self.by_id = {}
+        self._positions = {}
+        for i, post in enumerate(self.items):
+            self.by_id[post["id"]] = post
+            self._positions[post["id"]] = i
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def get(self, post_id):
+        """
+        ID で投稿を取得する
+
+        :return: 投稿データ（存在しない場合は None）
+        """
+        return self.by_id.get(post_id)
+
+    def with_post(self, post):
+        """
+        投稿を追加した（同じIDがあれば置き換えた）新しい PostsCollection を返す
+
+        このインスタンスは他のスレッドが参照している可能性があるため変更しない
+
+        :param post: 追加・更新後の投稿データ
+        :return: 変更を反映した PostsCollection
+        """
+        items = list(self.items)
+        i = self._positions.get(post["id"])
+        if i is None:
+            items.append(post)
+        else:
+            items[i] = post
+        return PostsCollection(items)
+
+    def without_post(self, post_id):
+        """
+        指定IDの投稿を取り除いた新しい PostsCollection を返す
+
+        このインスタンスは他のスレッドが参照している可能性があるため変更しない
+
+        :param post_id: 削除する投稿ID
+        :return: 変更を反映した PostsCollection（該当する投稿が無い場合は自身）
+        """
+        if post_id not in self.by_id:
+            return self
+        return PostsCollection(p for p in self.items if p["id"] != post_id)
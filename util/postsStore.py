@@ -0,0 +1,176 @@
+"""
+投稿データの永続化を担当するモジュール
+
+投稿データは以下の2ファイルで管理する。
+- posts.json  : ある時点の全投稿（スナップショット）。従来と同じ JSON 配列形式
+- posts.jsonl : スナップショット以降の変更を1行1件で追記するログ（JSON Lines）
+
+投稿の作成・更新・削除はログへの1行追記のみで完了するため、
+投稿件数に関わらず書き込み量は一定になる。
+ログが投稿件数に応じた件数たまったらスナップショットを作り直し、ログを空にする（コンパクション）
+
+※ キャッシュ管理は util/dataLoader.py 側で行う
+"""
+
+import os
+from util.jsonFile import read_json, write_json_array, dumps_line, loads_line
+
+# プロジェクトのルートディレクトリ
+# util ディレクトリの1階層上を基準にする
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# data フォルダのパス
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# 投稿データ（スナップショット）JSON のパス
+POSTS_PATH = os.path.join(DATA_DIR, "posts.json")
+
+# 投稿データの変更ログ（JSON Lines）のパス
+POSTS_LOG_PATH = os.path.join(DATA_DIR, "posts.jsonl")
+
+# ログの件数がこの値に達したらスナップショットを作り直す（最小値）
+COMPACT_THRESHOLD = 200
+
+# 投稿件数に対するログ件数の割合がこの値に達するまではスナップショットを作り直さない
+# 投稿が多いほどコンパクションの間隔が広がるため、1回の変更あたりの書き込み量は
+# 投稿件数に関わらずほぼ一定になる
+COMPACT_RATIO = 0.5
+
+# ログのレコード種別
+OP_PUT = "put"   # 投稿の追加・更新（同じIDがあれば置き換え）
+OP_DEL = "del"   # 投稿の削除
+
+
+def state_key():
+    """
+    スナップショットとログの現在の状態を返す
+
+    キャッシュの有効判定に使用する。どちらのファイルも存在しない場合は None
+
+    :return: (スナップショットの更新時刻（ナノ秒）, ログのサイズ) または None
+    """
+    try:
+        snapshot_mtime = os.stat(POSTS_PATH).st_mtime_ns
+    except OSError:
+        snapshot_mtime = None
+
+    try:
+        log_size = os.stat(POSTS_LOG_PATH).st_size
+    except OSError:
+        log_size = 0
+
+    if snapshot_mtime is None and log_size == 0:
+        return None
+
+    return (snapshot_mtime, log_size)
+
+
+def needs_compaction(log_count, post_count):
+    """
+    スナップショットを作り直す時期か判定する
+
+    :param log_count: スナップショット以降に追記したログの件数
+    :param post_count: 現在の投稿件数
+    :return: 作り直す場合は True
+    """
+    return log_count >= max(COMPACT_THRESHOLD, int(post_count * COMPACT_RATIO))
+
+
+def read_posts():
+    """
+    スナップショットを読み込み、ログの変更を順に反映した投稿一覧を返す
+
+    :return: (投稿データのリスト, 反映したログの件数)
+    """
+    # スナップショットを読み込む（未作成の場合は空から始める）
+    try:
+        posts = read_json(POSTS_PATH)
+    except FileNotFoundError:
+        posts = []
+
+    # ID → リスト上の位置
+    positions = {p["id"]: i for i, p in enumerate(posts)}
+    count = 0
+
+    try:
+        with open(POSTS_LOG_PATH, "rb") as f:
+            for line in f:
+                try:
+                    record = loads_line(line)
+                except ValueError:
+                    # 書き込み途中で中断された行は無視する
+                    continue
+
+                count += 1
+
+                if record["op"] == OP_PUT:
+                    post = record["post"]
+                    i = positions.get(post["id"])
+                    if i is None:
+                        positions[post["id"]] = len(posts)
+                        posts.append(post)
+                    else:
+                        posts[i] = post
+
+                elif record["op"] == OP_DEL:
+                    i = positions.pop(record["id"], None)
+                    if i is not None:
+                        # 削除済みの印を付け、最後にまとめて取り除く
+                        posts[i] = None
+
+    except FileNotFoundError:
+        pass
+
+    posts = [p for p in posts if p is not None]
+    return posts, count
+
+
+def append_put(post):
+    """
+    投稿の追加・更新をログに1行追記する
+
+    :param post: 追加・更新後の投稿データ
+    """
+    _append({"op": OP_PUT, "post": post})
+
+
+def append_delete(post_id):
+    """
+    投稿の削除をログに1行追記する
+
+    :param post_id: 削除する投稿ID
+    """
+    _append({"op": OP_DEL, "id": post_id})
+
+
+def _append(record):
+    """
+    ログファイルの末尾にレコードを1行追記する
+
+    前回の追記が途中で中断され、末尾が改行で終わっていない場合は先に改行を補う。
+    （中断された行と同じ行に書き込むと、read_posts で行ごと無視されてしまうため）
+    """
+    with open(POSTS_LOG_PATH, "a+b") as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(dumps_line(record))
+
+
+def compact(posts):
+    """
+    全投稿をスナップショットとして書き込み、ログを空にする
+
+    スナップショットの置き換えが完了してからログを削除するため、
+    途中で中断してもログの再適用で同じ内容に復元できる
+
+    :param posts: 投稿データのリスト
+    """
+    # 全投稿分のバイト列を組み立てず、1件ずつ書き込む
+    write_json_array(POSTS_PATH, posts)
+
+    try:
+        os.remove(POSTS_LOG_PATH)
+    except FileNotFoundError:
+        pass
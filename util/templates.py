@@ -0,0 +1,33 @@
+"""
+アプリケーション全体で共有する Jinja2 テンプレート設定
+
+main.py / control / services の各モジュールはここで生成した templates を使用する。
+インスタンスを1つにまとめることで、同じテンプレートが複数回コンパイルされるのを防ぐ
+"""
+
+import os
+from dotenv import load_dotenv
+from jinja2 import FileSystemBytecodeCache
+from fastapi.templating import Jinja2Templates
+
+# 環境変数（TEMPLATE_AUTO_RELOAD）を .env から読み込む
+load_dotenv()
+
+# プロジェクトのルートディレクトリ
+# util ディレクトリの1階層上を基準にする
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# コンパイル済みテンプレートの保存先
+JINJA_CACHE_DIR = os.path.join(BASE_DIR, ".jinja_cache")
+
+# Jinja2 テンプレートの読み込み設定
+# templates ディレクトリ配下の HTML をレンダリングする
+templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+
+# コンパイル済みテンプレートを .jinja_cache に保存し、再起動後も再利用する
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+# テンプレートファイルの更新チェック
+# 本番環境では TEMPLATE_AUTO_RELOAD=0 を指定し、描画のたびに更新時刻を確認しないようにする
+templates.env.auto_reload = os.getenv("TEMPLATE_AUTO_RELOAD", "1") == "1"